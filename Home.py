@@ -1,5 +1,9 @@
 import streamlit as st
 from PIL import Image
+from libs import prewarm
+
+# Loads and indexes the clean dataset in the background when the server starts, for the Dashboard.
+prewarm()
 
 ### Layout Streamlit
 st.set_page_config(page_title="Curry Company - Home", page_icon="📈", layout="wide")
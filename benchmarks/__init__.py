@@ -0,0 +1,5 @@
+# Benchmark suite, run from the repository root:
+#   python -m benchmarks.generate 1e6 ./data/dataset_raw_1e6.csv   synthetic raw CSV at any scale
+#   python -m benchmarks.run --rows 1e4 1e5 1e6                     timings and peak memory, to benchmarks/results/<commit>.json
+#   python -m benchmarks.compare base.json head.json                slowdowns between two result files
+#   python -m benchmarks.load_test --sessions 1 5 20                resident memory per concurrent Dashboard session
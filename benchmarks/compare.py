@@ -0,0 +1,45 @@
+import argparse
+import json
+import sys
+
+def compare(base: dict, head: dict, threshold: float = 1.2):
+    """
+    Compares two benchmark reports written by `run`.
+
+    :param base: Report of the reference commit.
+    :param head: Report of the commit under test.
+    :param threshold: Ratio of the head to the base minimum time above which a benchmark is a regression.
+    :return: List of dictionaries with "name", "rows", "base_s", "head_s", "ratio", "base_mib", "head_mib"
+        and "regression", for the benchmarks present in both reports.
+    """
+    base_results = {(result["name"], result["rows"]): result for result in base["results"]}
+    rows = []
+    for result in head["results"]:
+        reference = base_results.get((result["name"], result["rows"]))
+        if reference is None:
+            continue
+        ratio = result["seconds_min"] / reference["seconds_min"] if reference["seconds_min"] else float("inf")
+        rows.append({
+            "name": result["name"], "rows": result["rows"],
+            "base_s": reference["seconds_min"], "head_s": result["seconds_min"], "ratio": ratio,
+            "base_mib": reference["peak_mib"], "head_mib": result["peak_mib"],
+            "regression": ratio > threshold,
+        })
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files; exits with 1 on regressions.")
+    parser.add_argument("base", help="results of the reference commit")
+    parser.add_argument("head", help="results of the commit under test")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+    rows = compare(base, head, args.threshold)
+    for row in rows:
+        memory = f" {row['base_mib']:9.1f} -> {row['head_mib']:9.1f} MiB" if row["base_mib"] is not None and row["head_mib"] is not None else ""
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['rows']:>10} {row['name']:<45} {row['base_s']:9.4f} -> {row['head_s']:9.4f} s  x{row['ratio']:.2f}{memory}{flag}")
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
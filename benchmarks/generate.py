@@ -0,0 +1,124 @@
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pc
+
+# City codes of the delivery service IDs and the approximate coordinates of their centers.
+CITY_CENTERS = {
+    "INDO": (22.72, 75.86), "BANG": (12.97, 77.59), "COIMB": (11.02, 76.96), "CHEN": (13.08, 80.27),
+    "HYD": (17.39, 78.49), "RANCHI": (23.34, 85.31), "MYS": (12.30, 76.64), "DEH": (30.32, 78.03),
+    "KOC": (9.93, 76.27), "PUNE": (18.52, 73.86), "MUM": (19.08, 72.88), "JAP": (26.91, 75.79),
+    "SUR": (21.17, 72.83), "LUDH": (30.90, 75.85), "KNP": (26.45, 80.33), "AGR": (27.18, 78.01),
+    "ALH": (25.44, 81.85), "VAD": (22.31, 73.18), "GOA": (15.50, 73.83), "AURG": (19.88, 75.34),
+    "BHP": (23.26, 77.41), "KOL": (22.57, 88.36),
+}
+RESTAURANTS_PER_CITY = 20
+SERVICES_PER_RESTAURANT = 3
+
+# (values, probabilities) of the categorical columns, close to the mix of the original dataset.
+# Values keep the trailing space and the "NaN " / "conditions NaN" placeholders of the raw CSV.
+MIXES = {
+    "Weatherconditions": (["conditions Sunny", "conditions Stormy", "conditions Sandstorms", "conditions Cloudy", "conditions Fog", "conditions Windy", "conditions NaN"],
+                          [0.165, 0.165, 0.165, 0.165, 0.165, 0.165, 0.01]),
+    "Road_traffic_density": (["Low ", "Jam ", "Medium ", "High ", "NaN "], [0.34, 0.31, 0.24, 0.10, 0.01]),
+    "Vehicle_condition": ([0, 1, 2, 3], [0.33, 0.33, 0.33, 0.01]),
+    "Type_of_order": (["Snack ", "Meal ", "Drinks ", "Buffet "], [0.25, 0.25, 0.25, 0.25]),
+    "Type_of_vehicle": (["motorcycle ", "scooter ", "electric_scooter ", "bicycle "], [0.58, 0.335, 0.08, 0.005]),
+    "multiple_deliveries": (["0", "1", "2", "3", "NaN "], [0.31, 0.62, 0.04, 0.01, 0.02]),
+    "Festival": (["No ", "Yes ", "NaN "], [0.975, 0.02, 0.005]),
+    "City": (["Metropolitian ", "Urban ", "Semi-Urban ", "NaN "], [0.745, 0.22, 0.01, 0.025]),
+}
+FIRST_DAY, LAST_DAY = "2022-02-11", "2022-04-06"
+
+def generate_raw(rows: int, seed: int = 0, start_id: int = 0):
+    """
+    Generates synthetic orders in the format of "dataset_raw.csv": same columns, string padding, "NaN "
+    placeholders, "conditions " weather prefix, "(min) NN" delivery times, misspelled "Metropolitian",
+    negative and (0, 0) coordinates, out-of-range ratings and orders picked up after midnight.
+    Each delivery service belongs to one restaurant, placed around the center of the city in its ID.
+
+    :param rows: Number of orders.
+    :param seed: Seed of the random generator.
+    :param start_id: Number of the first order, so chunks of a large file get distinct IDs.
+    :return: DataFrame of strings and numbers, as read from the raw CSV.
+    """
+    rng = np.random.default_rng(seed)
+    cities = list(CITY_CENTERS)
+    city = rng.integers(0, len(cities), rows)
+    restaurant = rng.integers(1, RESTAURANTS_PER_CITY + 1, rows)
+    service = rng.integers(1, SERVICES_PER_RESTAURANT + 1, rows)
+    ids = np.array([[[f"{code}RES{r:02d}DEL{s:02d} " for s in range(SERVICES_PER_RESTAURANT + 1)] for r in range(RESTAURANTS_PER_CITY + 1)] for code in cities], dtype=object)
+    # Restaurant coordinates are a fixed function of the (city, restaurant) pair, whatever the seed.
+    places = np.random.default_rng(len(cities)).normal(0, 0.05, (len(cities), RESTAURANTS_PER_CITY + 1, 2))
+    centers = np.array(list(CITY_CENTERS.values()))
+    restaurant_lat = centers[city, 0] + places[city, restaurant, 0]
+    restaurant_lon = centers[city, 1] + places[city, restaurant, 1]
+    delivery_lat = restaurant_lat + rng.choice([-1, 1], rows) * rng.uniform(0.01, 0.15, rows)
+    delivery_lon = restaurant_lon + rng.choice([-1, 1], rows) * rng.uniform(0.01, 0.15, rows)
+    negative = rng.random(rows) < 0.01
+    restaurant_lat = np.where(negative, -restaurant_lat, restaurant_lat)
+    restaurant_lon = np.where(negative, -restaurant_lon, restaurant_lon)
+    null_island = rng.random(rows) < 0.008
+    restaurant_lat = np.where(null_island, 0.0, restaurant_lat)
+    restaurant_lon = np.where(null_island, 0.0, restaurant_lon)
+    delivery_lat = np.where(null_island, rng.uniform(0.01, 0.15, rows), delivery_lat)
+    delivery_lon = np.where(null_island, rng.uniform(0.01, 0.15, rows), delivery_lon)
+    days = pd.date_range(FIRST_DAY, LAST_DAY).strftime("%d-%m-%Y").to_numpy(dtype=object)
+    clock = np.array([f"{minute // 60:02d}:{minute % 60:02d}:00" for minute in range(24 * 60)], dtype=object)
+    # Orders concentrate in the evening peak (17:00 to 23:00) and the morning peak (08:00 to 11:00).
+    peak = rng.choice(3, rows, p=[0.6, 0.25, 0.15])
+    ordered = np.select([peak == 0, peak == 1], [rng.integers(17 * 60, 24 * 60, rows), rng.integers(8 * 60, 11 * 60, rows)], rng.integers(0, 24 * 60, rows))
+    picked = (ordered + rng.choice([5, 10, 15], rows)) % (24 * 60)
+    ages = np.array([str(age) for age in range(15, 51)], dtype=object)
+    ratings = np.array([f"{rating / 10:.1f}" for rating in range(10, 51)], dtype=object)
+    df = pd.DataFrame({
+        "ID": [f"0x{i:04x} " for i in range(start_id, start_id + rows)],
+        "Delivery_person_ID": ids[city, restaurant, service],
+        "Delivery_person_Age": _with_nan(rng, ages[rng.integers(20 - 15, 40 - 15, rows)], 0.04),
+        "Delivery_person_Ratings": _with_nan(rng, np.where(rng.random(rows) < 0.001, "6", ratings[np.clip(np.round(rng.normal(46, 3, rows)), 25, 50).astype(int) - 10]).astype(object), 0.04),
+        "Restaurant_latitude": restaurant_lat,
+        "Restaurant_longitude": restaurant_lon,
+        "Delivery_location_latitude": delivery_lat,
+        "Delivery_location_longitude": delivery_lon,
+        "Order_Date": days[rng.integers(0, len(days), rows)],
+        "Time_Orderd": _with_nan(rng, clock[ordered], 0.04),
+        "Time_Order_picked": clock[picked],
+    })
+    for col, (values, probabilities) in MIXES.items():
+        df[col] = np.array(values, dtype=object)[rng.choice(len(values), rows, p=probabilities)]
+    df["Time_taken(min)"] = "(min) " + pd.Series(rng.integers(10, 55, rows)).astype(str)
+    return df[["ID", "Delivery_person_ID", "Delivery_person_Age", "Delivery_person_Ratings", "Restaurant_latitude", "Restaurant_longitude", "Delivery_location_latitude", "Delivery_location_longitude", "Order_Date", "Time_Orderd", "Time_Order_picked", "Weatherconditions", "Road_traffic_density", "Vehicle_condition", "Type_of_order", "Type_of_vehicle", "multiple_deliveries", "Festival", "City", "Time_taken(min)"]]
+
+def write_raw_csv(path: str, rows: int, seed: int = 0, chunksize: int = 1_000_000):
+    """
+    Writes a synthetic raw CSV chunk by chunk, so files of 1e7 rows and more are generated in bounded memory.
+    Chunks are written with the Arrow CSV writer, unquoted like the original file, several times faster
+    than `DataFrame.to_csv`.
+
+    :param path: Path of the CSV file to write.
+    :param rows: Number of orders.
+    :param seed: Seed of the first chunk; chunk i uses seed + i.
+    :param chunksize: Number of orders generated at a time.
+    :return: The path of the file.
+    """
+    options = pc.WriteOptions(include_header=False, quoting_style="none")
+    with open(path, "wb") as f:
+        for i, start in enumerate(range(0, rows, chunksize)):
+            chunk = generate_raw(min(chunksize, rows - start), seed + i, start)
+            if i == 0:
+                f.write((",".join(chunk.columns) + "\n").encode())
+            pc.write_csv(pa.Table.from_pandas(chunk, preserve_index=False), f, options)
+    return path
+
+def _with_nan(rng: np.random.Generator, values: np.ndarray, share: float):
+    values[rng.random(len(values)) < share] = "NaN "
+    return values
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic raw orders CSV.")
+    parser.add_argument("rows", type=float, help="number of orders, e.g. 1e6")
+    parser.add_argument("path", help="output CSV path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_raw_csv(args.path, int(args.rows), args.seed)
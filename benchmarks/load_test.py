@@ -0,0 +1,158 @@
+import argparse
+import datetime as dt
+import json
+import os
+import resource
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+import numpy as np
+from .generate import write_raw_csv
+from .run import DEFAULT_FILTERS, _metadata
+
+# Values the simulated sessions pick their filters from. Rare values (festivals, semi-urban cities) are left
+# out, so every selection keeps enough rows for the metrics of the Delivery view.
+FILTER_CHOICES = {
+    "Road_traffic_density": ["Low", "Medium", "High", "Jam"],
+    "City": ["Metropolitan", "Urban"],
+    "Type_of_order": ["Buffet", "Drinks", "Meal", "Snack"],
+}
+
+def rss_mib():
+    """
+    :return: Resident set size of the current process in MiB, read from /proc on Linux; elsewhere the
+        peak resident set size, which overestimates it once memory was released.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if os.uname().sysname == "Darwin" else peak / 1024
+
+def random_filters(rng: np.random.Generator):
+    """
+    Draws a Dashboard filter state: a random date range of at least a week and up to one value of each
+    categorical filter.
+
+    :param rng: Random generator.
+    :return: Dictionary with the filter state (see `libs.utils.apply_filters`).
+    """
+    days = (DEFAULT_FILTERS["date"][1] - DEFAULT_FILTERS["date"][0]).days
+    start = int(rng.integers(0, days - 7))
+    end = int(rng.integers(start + 7, days + 1))
+    filters = {**DEFAULT_FILTERS, "date": (DEFAULT_FILTERS["date"][0] + dt.timedelta(days=start), DEFAULT_FILTERS["date"][0] + dt.timedelta(days=end))}
+    for col, values in FILTER_CHOICES.items():
+        filters[col] = [str(rng.choice(values))] if rng.random() < 0.5 else []
+    return filters
+
+def session(mode: str, raw_path: str, cache_path: str, seed: int, reruns: int, loaded: threading.Barrier, done: threading.Barrier, measured: threading.Event):
+    """
+    One simulated Dashboard session: loads the dataset as the Dashboard of the given mode does, runs
+    `reruns` reruns of the Delivery view data path with random filters, then keeps the frames of its last
+    rerun alive, as a session rendering its page does, until the memory of every session is measured.
+
+    :param mode: "shared" (one `libs.SharedDataset` per process, filter positions cached per state), "mapped"
+        (the same, with the dataset memory-mapped from its columnar store) or "per_session" (every session
+        loads its own copy of the dataset and indexes and keeps its filtered frame).
+    """
+    from libs import load_dataset, load_dashboard_data, metrics_cache, filter_key, required_columns, SharedDataset, get_mean_ratings_by_service, get_means_ratings_by_traffic, get_mean_ratings_by_weather, get_metrics_deliveries
+    try:
+        if mode == "per_session":
+            dataset = SharedDataset(load_dataset(raw_path, cache_path))
+        else:
+            dataset = load_dashboard_data(raw_path, cache_path, store_path=_store_path(cache_path) if mode == "mapped" else None)
+        loaded.wait()
+        rng = np.random.default_rng(seed)
+        # Like the Dashboard, each rerun takes only the columns its functions declare.
+        columns = required_columns(get_mean_ratings_by_service, get_means_ratings_by_traffic, get_mean_ratings_by_weather, get_metrics_deliveries)
+        for _ in range(reruns):
+            filters = random_filters(rng)
+            key = f"{dataset.version}:{filter_key(filters)}"
+            if mode != "per_session":
+                df, rollup = dataset.frames(metrics_cache.call(dataset.select, key, filters), columns)
+            else:
+                df, rollup = dataset.frames(dataset.select(filters), columns)
+            for fn in (get_mean_ratings_by_service, get_means_ratings_by_traffic, get_mean_ratings_by_weather, get_metrics_deliveries):
+                metrics_cache.call(fn, key, df)
+        done.wait()
+        measured.wait()
+    except BaseException:
+        # Release the other sessions and the measuring thread instead of leaving them waiting.
+        loaded.abort()
+        done.abort()
+        raise
+    return dataset, df, rollup
+
+def load_test(raw_path: str, cache_path: str, sessions: int, mode: str = "shared", reruns: int = 5, seed: int = 0):
+    """
+    Simulates concurrent Dashboard sessions in threads of one process, like the Streamlit server runs
+    them, and measures the resident memory they add.
+
+    :param raw_path: Path of the raw CSV.
+    :param cache_path: Path of its Parquet cache (built first if missing).
+    :param sessions: Number of concurrent sessions.
+    :param mode: "shared", "mapped" or "per_session" (see `session`).
+    :param reruns: Number of reruns per session.
+    :param seed: Seed of the filter states; session i uses seed + i.
+    :return: Dictionary with the resident memory before the sessions ("base_mib"), once every session loaded
+        its dataset ("loaded_mib") and with every session alive after its reruns ("alive_mib"), and the
+        memory added per session in total ("per_session_mib") and by the reruns alone ("rerun_mib").
+    """
+    # The Parquet cache and the columnar store are built and the metrics modules imported before the baseline,
+    # so none of them is counted per session.
+    from libs import load_dataset, get_metrics_deliveries
+    load_dataset(raw_path, cache_path, store_path=_store_path(cache_path) if mode == "mapped" else None)
+    base = rss_mib()
+    loaded, done, measured = threading.Barrier(sessions + 1, timeout=600), threading.Barrier(sessions + 1, timeout=600), threading.Event()
+    threads = [threading.Thread(target=session, args=(mode, raw_path, cache_path, seed + i, reruns, loaded, done, measured)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    loaded.wait()
+    after_load = rss_mib()
+    done.wait()
+    alive = rss_mib()
+    measured.set()
+    for thread in threads:
+        thread.join()
+    return {
+        "mode": mode, "sessions": sessions, "reruns": reruns,
+        "base_mib": base, "loaded_mib": after_load, "alive_mib": alive,
+        "per_session_mib": (alive - base) / sessions, "rerun_mib": (alive - after_load) / sessions,
+    }
+
+def _store_path(cache_path: str):
+    return os.path.splitext(cache_path)[0] + ".columns"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate concurrent Dashboard sessions and report the resident memory per session.")
+    parser.add_argument("--rows", type=float, default=1e5, help="dataset size")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--modes", nargs="+", default=["shared", "mapped", "per_session"], choices=["shared", "mapped", "per_session"])
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--data-dir", default="./benchmarks/data")
+    parser.add_argument("--out", help="output JSON path (default: ./benchmarks/results/load_<commit>.json)")
+    args = parser.parse_args()
+    os.makedirs(args.data_dir, exist_ok=True)
+    rows = int(args.rows)
+    raw_path = os.path.join(args.data_dir, f"raw_{rows}_0.csv")
+    if not os.path.exists(raw_path):
+        write_raw_csv(raw_path, rows)
+    cache_path = os.path.join(args.data_dir, f"clean_{rows}_0.parquet")
+    results = []
+    for mode in args.modes:
+        for sessions in args.sessions:
+            # Each configuration runs in a fresh process, so memory released by a previous one is not reused.
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(load_test, raw_path, cache_path, sessions, mode, args.reruns).result()
+            print(f"{mode:<12} {sessions:>4} sessions: {result['base_mib']:8.1f} MiB before, {result['alive_mib']:8.1f} MiB with every session alive, {result['per_session_mib']:7.1f} MiB per session ({result['rerun_mib']:.1f} MiB from its reruns)", flush=True)
+            results.append({"rows": rows, **result})
+    report = {"meta": _metadata(), "results": results}
+    out = args.out or os.path.join("./benchmarks/results", f"load_{(report['meta']['commit'] or 'unknown')[:12]}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"Results written to {out}")
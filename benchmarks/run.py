@@ -0,0 +1,209 @@
+import argparse
+import datetime as dt
+import fnmatch
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import pyarrow
+import libs
+from haversine import haversine
+from libs import (
+    clear_data, load_dataset, apply_filters, build_rollup, filter_key, stringfy_time, FilterIndex,
+    haversine_np, RAW_DTYPES,
+    )
+from .generate import write_raw_csv
+
+# Extra arguments of the metrics functions that do not take the DataFrame alone.
+FUNCTION_KWARGS = {
+    "get_nearest_restaurants": {"lat": 22.72, "lon": 75.86},
+}
+
+# Filter states of the Dashboard filter path benchmark: everything, one city type, and one week of low traffic.
+FILTER_STATES = {
+    "all": {},
+    "city": {"City": ["Urban"]},
+    "week": {"date": (dt.date(2022, 3, 1), dt.date(2022, 3, 7)), "Road_traffic_density": ["Low"]},
+}
+# Columns read by the metrics of the Restaurant view, for the projected load benchmark.
+# Numbers of worker processes of the parallel cleaning benchmarks: 1 up to the number of CPUs, and at least 2
+# so the cost of the process pool shows on a single CPU.
+CLEAN_WORKERS = range(1, max(os.cpu_count() or 1, 2) + 1)
+# Coordinate columns of the distance benchmarks, in the argument order of `haversine_np`.
+COORDINATE_COLUMNS = ["Restaurant_latitude", "Restaurant_longitude", "Delivery_location_latitude", "Delivery_location_longitude"]
+# Rows per slice of the chunked distance benchmark.
+HAVERSINE_CHUNK_SIZE = 100_000
+RESTAURANT_COLUMNS = ["Pick_time(min)", "City", "Type_of_order", "Road_traffic_density", "Delivery_service_ID", "Velocity(km/h)"]
+DEFAULT_FILTERS = {
+    "date": (dt.date(2022, 2, 11), dt.date(2022, 4, 6)),
+    "Delivery_person_Age": (15, 50),
+    "Delivery_person_Ratings": (1.0, 6.0),
+    "Road_traffic_density": [],
+    "City": [],
+    "Type_of_order": [],
+    "Festival": [],
+}
+
+def measure(fn, repeat: int = 3, memory: bool = True, setup=None):
+    """
+    Times a function and measures its peak memory.
+
+    :param fn: Function to benchmark, called with the result of `setup` if given, else without arguments.
+    :param repeat: Number of timed calls.
+    :param memory: If True, makes one more call under `tracemalloc` for the peak memory above the memory in
+        use before the call. Allocations made by code that bypasses the Python allocators (some Arrow and
+        Parquet buffers) are not traced.
+    :param setup: Optional function preparing the argument of each call, outside of the timed section.
+    :return: Dictionary with "seconds_min", "seconds_median", "repeat" and "peak_mib" (None without memory).
+    """
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        gc.collect()
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        times.append(time.perf_counter() - start)
+    peak_mib = None
+    if memory:
+        arg = setup() if setup else None
+        gc.collect()
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(arg) if setup else fn()
+        peak_mib = (tracemalloc.get_traced_memory()[1] - base) / 2**20
+        tracemalloc.stop()
+    return {"seconds_min": min(times), "seconds_median": statistics.median(times), "repeat": repeat, "peak_mib": peak_mib}
+
+def benchmarks(raw_path: str, cache_path: str):
+    """
+    Lists the benchmarks of one dataset size, in the order they run. The clean dataset and the load-time
+    structures are built lazily by the benchmarks that need them.
+
+    :param raw_path: Path of the synthetic raw CSV.
+    :param cache_path: Path of the Parquet cache used by the `load_dataset` benchmarks.
+    :return: List of (name, function, setup) tuples.
+    """
+    state = {}
+
+    def clean():
+        if "clean" not in state:
+            state["clean"] = clear_data(pd.read_csv(raw_path, dtype=RAW_DTYPES))
+        return state["clean"]
+
+    def structure(name, build):
+        if name not in state:
+            state[name] = build()
+        return state[name]
+
+    store_path = os.path.splitext(cache_path)[0] + ".columns"
+
+    def cold_load():
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        return load_dataset(raw_path, cache_path)
+
+    def coordinates():
+        return clean()[COORDINATE_COLUMNS]
+
+    def filter_path(filters):
+        rollup = structure("rollup", lambda: build_rollup(clean()))
+        clear_index = structure("clear_index", lambda: FilterIndex(clean()))
+        rollup_index = structure("rollup_index", lambda: FilterIndex(rollup, date_column="Day_Ordered"))
+        filter_key(filters)
+        df = apply_filters(clean(), filters, index=clear_index)
+        apply_filters(rollup, filters, index=rollup_index)
+        return df
+
+    items = [
+        ("read_csv", lambda: pd.read_csv(raw_path, dtype=RAW_DTYPES), None),
+        ("clear_data", clear_data, lambda: pd.read_csv(raw_path, dtype=RAW_DTYPES)),
+        *((f"clear_data.workers_{workers}", lambda df, workers=workers: clear_data(df, workers=workers), lambda: pd.read_csv(raw_path, dtype=RAW_DTYPES))
+          for workers in CLEAN_WORKERS),
+        ("load_dataset.cold", cold_load, None),
+        ("load_dataset.warm", lambda: load_dataset(raw_path, cache_path), None),
+        ("load_dataset.columnar", lambda: load_dataset(raw_path, cache_path, store_path=store_path), None),
+        ("load_dataset.columnar.restaurant", lambda: load_dataset(raw_path, cache_path, store_path=store_path, columns=RESTAURANT_COLUMNS), None),
+        ("build_rollup", lambda: build_rollup(clean()), None),
+        ("FilterIndex", lambda: FilterIndex(clean()), None),
+        ("haversine.rowwise", lambda df: df.apply(lambda x: haversine((x.iloc[0], x.iloc[1]), (x.iloc[2], x.iloc[3])), axis=1), coordinates),
+        ("haversine_np", lambda df: haversine_np(*(df[c] for c in COORDINATE_COLUMNS)), coordinates),
+        ("haversine_np.chunked", lambda df: haversine_np(*(df[c] for c in COORDINATE_COLUMNS), chunk_size=HAVERSINE_CHUNK_SIZE), coordinates),
+        ("stringfy_time", lambda: stringfy_time(clean()["Pick_time(min)"]), None),
+    ]
+    for name in sorted(n for n in dir(libs) if n.startswith(("get_", "plot_"))):
+        fn = getattr(libs, name)
+        items.append((name, lambda fn=fn, kwargs=FUNCTION_KWARGS.get(name, {}): fn(clean(), **kwargs), None))
+    for state_name, overrides in FILTER_STATES.items():
+        items.append((f"dashboard.filter_path.{state_name}", lambda filters={**DEFAULT_FILTERS, **overrides}: filter_path(filters), None))
+    return items
+
+def run(sizes: list[int], data_dir: str = "./benchmarks/data", repeat: int = 3, memory: bool = True, only: str = "*", seed: int = 0):
+    """
+    Runs the benchmarks on synthetic datasets of several sizes. Raw CSVs are generated once per size and
+    seed in `data_dir` and reused by later runs.
+
+    :param sizes: Numbers of raw rows.
+    :param data_dir: Directory of the synthetic raw CSVs and of the Parquet caches.
+    :param repeat: Number of timed calls per benchmark.
+    :param memory: If True, also measures the peak memory of each benchmark.
+    :param only: Shell-style pattern selecting the benchmarks to run, e.g. "plot_*".
+    :param seed: Seed of the synthetic datasets.
+    :return: Dictionary with the run metadata ("meta") and one result per benchmark and size ("results").
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    results = []
+    for rows in sizes:
+        raw_path = os.path.join(data_dir, f"raw_{rows}_{seed}.csv")
+        if not os.path.exists(raw_path):
+            write_raw_csv(raw_path, rows, seed)
+        cache_path = os.path.join(data_dir, f"clean_{rows}_{seed}.parquet")
+        for name, fn, setup in benchmarks(raw_path, cache_path):
+            if not fnmatch.fnmatch(name, only):
+                continue
+            # The first call warms up the lazy state (clean dataset, indexes) and any import or compile cost.
+            fn(setup()) if setup else fn()
+            result = {"name": name, "rows": rows, **measure(fn, repeat, memory, setup)}
+            print(f"{rows:>10} {name:<45} {result['seconds_min']:10.4f} s" + (f" {result['peak_mib']:10.1f} MiB" if memory else ""), flush=True)
+            results.append(result)
+    return {"meta": _metadata(), "results": results}
+
+def _metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = None, None
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "date": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pyarrow.__version__,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the benchmarks and write the results to a JSON file.")
+    parser.add_argument("--rows", type=float, nargs="+", default=[1e4, 1e5], help="dataset sizes, e.g. 1e4 1e6")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory measurements")
+    parser.add_argument("--only", default="*", help="shell-style pattern of the benchmarks to run")
+    parser.add_argument("--data-dir", default="./benchmarks/data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="output JSON path (default: ./benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+    report = run([int(rows) for rows in args.rows], args.data_dir, args.repeat, not args.no_memory, args.only, args.seed)
+    out = args.out or os.path.join("./benchmarks/results", f"{(report['meta']['commit'] or 'unknown')[:12]}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"Results written to {out}")
@@ -1,13 +1,54 @@
 import builtins
-from .utils import pd, np, haversine, clear_data, load_dataset, check_outliers, stringfy_time
-from .metrics import (
-    get_metrics_company, get_metrics_deliveries, get_metrics_restaurants, 
-    get_mean_ratings_by_service, get_means_ratings_by_traffic, get_mean_ratings_by_weather, 
-    get_mean_pick_time_by_city, get_mean_pick_time_by_order, get_top_10_fastest_deliveries, 
-    get_mean_pick_time_by_traffic, plot_histogram, plot_orders_per_week, plot_orders_per_day, 
-    plot_orders_by_traffic, plot_orders_by_traffic_and_city_type, plot_weekly_orders_per_service, 
-    plot_central_delivery_locations, plot_restaurant_locations, plot_orders_heatmap, 
-    plot_deliveries_by_age, plot_deliveries_by_vehicle_condition, plot_correlation
-    )
-
-__all__ = ["pd"]
\ No newline at end of file
+import importlib
+
+# Public names of the package and the submodule defining each of them. Submodules are imported on first
+# access to one of their names (see `__getattr__`), so importing the package is cheap and pandas, plotly and
+# folium are only loaded by the pages that use them.
+_EXPORTS = {
+    "utils": [
+        "pd", "np", "clear_data", "clear_data_streaming", "load_dataset", "dataset_version", "append_orders", "imputation_drift",
+        "apply_filters", "check_outliers", "check_outliers_streaming", "stringfy_time", "location_tuples",
+        "LOCATION_COLUMNS", "CLEANER_VERSION", "CATEGORIES", "RAW_DTYPES",
+    ],
+    "columnar": ["read_columns", "write_columns", "read_manifest"],
+    "geo": ["haversine_np", "grid_aggregate", "grid_cell_size"],
+    "imputation": ["RunningStats"],
+    "projection": ["reads", "required_columns", "project"],
+    "rollup": ["build_rollup", "append_rollup", "ROLLUP_DIMENSIONS", "ROLLUP_PRESENCE", "ROLLUP_KEYS", "ROLLUP_SOURCE_COLUMNS"],
+    "filters": ["FilterIndex"],
+    "spatial": ["SpatialIndex"],
+    "stats": ["QuantileSketch"],
+    "profiling": ["ProfileRun", "profiled", "profile_step", "start_profiling", "stop_profiling", "propagate_profiling"],
+    "panels": ["PanelScheduler"],
+    "shared": ["SharedDataset"],
+    "memo": ["filter_key", "MetricsCache", "metrics_cache", "dataset_cache", "load_dataset_cached", "load_dashboard_data"],
+    "startup": ["prewarm"],
+    "metrics": [
+        "get_metrics_company", "get_metrics_deliveries", "get_metrics_restaurants",
+        "get_mean_ratings_by_service", "get_means_ratings_by_traffic", "get_mean_ratings_by_weather",
+        "get_mean_pick_time_by_city", "get_mean_pick_time_by_order", "get_top_10_fastest_deliveries",
+        "get_mean_pick_time_by_traffic", "get_orders_near_restaurants", "get_restaurant_density", "get_nearest_restaurants",
+        "plot_histogram", "plot_orders_per_week", "plot_orders_per_day", "plot_orders_by_traffic",
+        "plot_orders_by_traffic_and_city_type", "plot_weekly_orders_per_service",
+        "plot_deliveries_by_age", "plot_deliveries_by_vehicle_condition", "plot_correlation",
+    ],
+    "maps": ["plot_central_delivery_locations", "plot_restaurant_locations", "plot_orders_heatmap", "MAP_CENTER", "MAP_ZOOM", "RESTAURANT_GRID_ZOOM", "HEATMAP_RADIUS", "HEATMAP_GRID_ZOOM"],
+}
+# Names of other packages kept in the public API of this one, imported on first access too.
+_EXTERNAL_EXPORTS = {
+    "haversine": ["haversine"],
+}
+_MODULES = {name: f".{module}" for module, names in _EXPORTS.items() for name in names}
+_MODULES.update({name: module for module, names in _EXTERNAL_EXPORTS.items() for name in names})
+
+def __getattr__(name: str):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_MODULES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
+
+__all__ = ["pd"]
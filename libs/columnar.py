@@ -0,0 +1,118 @@
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = "manifest.json"
+# Bump whenever the layout of the column files changes, so existing stores are rewritten.
+FORMAT_VERSION = 1
+
+def read_manifest(path: str):
+    """
+    Reads the manifest of a columnar store: its key, number of rows and the schema of each column.
+
+    :param path: Directory of the columnar store.
+    :return: Dictionary with "format_version", "key", "rows" and "columns", or None if the store is missing.
+    """
+    try:
+        with open(os.path.join(path, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+def read_columns(path: str, key: dict | None, columns: list[str] | None = None):
+    """
+    Opens a columnar store written by `write_columns` if it was built for the given key. Column files are
+    memory-mapped, not read: opening the store takes milliseconds whatever its size, and the pages of a
+    column are only read from disk when the column is used. String columns are the exception, they are
+    decoded into Python strings when opened.
+    The arrays are read-only: the returned DataFrame must not be modified in place.
+
+    :param path: Directory of the columnar store.
+    :param key: Expected key. If None, any existing store is accepted.
+    :param columns: Optional list of the columns to open, in the order of the returned DataFrame. By default
+        every column is opened.
+    :return: DataFrame, or None if the store is missing, stale or written in another format.
+    """
+    manifest = read_manifest(path)
+    if manifest is None or manifest.get("format_version") != FORMAT_VERSION or (key is not None and manifest["key"] != key):
+        return None
+    schema = {column["name"]: column for column in manifest["columns"]}
+    names = list(schema) if columns is None else list(columns)
+    missing = [name for name in names if name not in schema]
+    if missing:
+        raise KeyError(f"{missing} not in the columnar store {path}")
+    data = {name: _open_column(path, schema[name]) for name in names}
+    return pd.DataFrame(data, index=pd.RangeIndex(manifest["rows"]), columns=names, copy=False)
+
+def write_columns(df: pd.DataFrame, path: str, key: dict | None):
+    """
+    Writes a clean DataFrame as a columnar store: one NumPy file per column array and a JSON manifest with
+    the key and the schema. Datetimes are stored as int64 nanoseconds, categoricals as their integer codes
+    with the categories in the manifest, nullable integers and floats as their values plus a boolean mask,
+    and strings as a fixed-width Unicode array.
+    The store is written to a temporary directory first and then moved, so readers never see a partial store.
+
+    :param df: Clean DataFrame with a default RangeIndex.
+    :param path: Directory of the columnar store.
+    :param key: Key the dataset was built for, stored in the manifest.
+    :return: Manifest written.
+    """
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    schema = []
+    for number, (name, values) in enumerate(df.items()):
+        column, arrays = _encode_column(name, values)
+        column["files"] = {}
+        for part, array in arrays.items():
+            column["files"][part] = f"{number:03d}.{part}.npy"
+            np.save(os.path.join(tmp_path, column["files"][part]), array, allow_pickle=False)
+        schema.append(column)
+    manifest = {"format_version": FORMAT_VERSION, "key": key, "rows": len(df), "columns": schema}
+    with open(os.path.join(tmp_path, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    # Stores opened earlier keep their memory maps of the replaced files until they are released.
+    old_path = path + ".old"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return manifest
+
+def _encode_column(name: str, values: pd.Series):
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        column = {"name": name, "kind": "category", "categories": dtype.categories.tolist(), "ordered": bool(dtype.ordered)}
+        return column, {"codes": values.cat.codes.to_numpy()}
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype) and dtype.kind in "biuf":
+        # Nullable integers, floats and booleans (Int64, Float64, boolean).
+        column = {"name": name, "kind": "masked", "dtype": dtype.name}
+        return column, {"values": values.to_numpy(dtype=dtype.numpy_dtype, na_value=0), "mask": values.isna().to_numpy()}
+    if dtype.kind == "M":
+        return {"name": name, "kind": "datetime", "dtype": str(dtype)}, {"values": values.to_numpy().view("int64")}
+    if dtype.kind in "biuf":
+        return {"name": name, "kind": "numeric"}, {"values": values.to_numpy()}
+    if dtype == object and values.map(lambda value: isinstance(value, str) or pd.isna(value)).all():
+        mask = values.isna().to_numpy()
+        return {"name": name, "kind": "string"}, {"values": values.where(~mask, "").to_numpy(dtype=str), "mask": mask}
+    raise TypeError(f"column {name!r} of dtype {dtype} cannot be stored in a columnar store")
+
+def _open_column(path: str, column: dict):
+    # Plain ndarray views of the memory maps, so pandas operations do not propagate the np.memmap subclass.
+    arrays = {part: np.load(os.path.join(path, file), mmap_mode="r", allow_pickle=False).view(np.ndarray) for part, file in column["files"].items()}
+    kind = column["kind"]
+    if kind == "category":
+        dtype = pd.CategoricalDtype(column["categories"], ordered=column["ordered"])
+        return pd.Categorical.from_codes(arrays["codes"], dtype=dtype, validate=False)
+    if kind == "masked":
+        return pd.api.types.pandas_dtype(column["dtype"]).construct_array_type()(arrays["values"], arrays["mask"])
+    if kind == "datetime":
+        return pd.Series(arrays["values"].view(column["dtype"]), copy=False).array
+    if kind == "numeric":
+        return arrays["values"]
+    values = arrays["values"].astype(object)
+    values[arrays["mask"]] = None
+    return values
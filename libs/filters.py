@@ -0,0 +1,68 @@
+from .utils import pd, np
+from .profiling import profiled
+
+CATEGORICAL_FILTERS = ["Road_traffic_density", "City", "Type_of_order", "Festival"]
+RANGE_FILTERS = ["Delivery_person_Age", "Delivery_person_Ratings"]
+
+class FilterIndex:
+    """
+    Index over the columns filtered by the Dashboard sidebar, built once at load time:
+    - one packed bitset (1 bit per row) for each value of the categorical filter columns;
+    - sorted values and row positions for the order day, age and rating columns, answering range queries
+      with a binary search.
+    `select` combines them into the row positions matching a filter state, without building any
+    intermediate DataFrame. Like `utils.apply_filters`, it skips the range filters of columns the indexed
+    frame does not have (the age and rating of a rollup cube).
+    """
+    @profiled
+    def __init__(self, df: pd.DataFrame, date_column: str = "Time_Ordered"):
+        """
+        :param df: DataFrame to index (the order frame or a rollup cube).
+        :param date_column: Datetime column the date range applies to.
+        """
+        self.rows = len(df)
+        self.date_column = date_column
+        self.bitsets = {}
+        for col in CATEGORICAL_FILTERS:
+            values = pd.Categorical(df[col])
+            codes = values.codes
+            self.bitsets[col] = {value: np.packbits(codes == code) for code, value in enumerate(values.categories)}
+        days = df[date_column].to_numpy(dtype="datetime64[D]")
+        days = np.where(np.isnat(days), np.nan, days.astype(np.float64))
+        self.sorted = {"date": _sorted_column(days)}
+        for col in RANGE_FILTERS:
+            if col in df.columns:
+                self.sorted[col] = _sorted_column(df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    def __repr__(self):
+        return f"FilterIndex(rows={self.rows}, date_column={self.date_column!r})"
+
+    def select(self, filters: dict):
+        """
+        Finds the rows matching a filter state.
+
+        :param filters: Dictionary with the filter state (see `utils.apply_filters`).
+        :return: Sorted NumPy array with the positions of the matching rows.
+        """
+        date_init, date_end = filters["date"]
+        days = (np.datetime64(date_init, "D").astype(np.float64), np.datetime64(date_end, "D").astype(np.float64))
+        bits = self._range_bits("date", *days)
+        for col in RANGE_FILTERS:
+            if col in self.sorted:
+                bits &= self._range_bits(col, *filters[col])
+        for col in CATEGORICAL_FILTERS:
+            if filters[col]:
+                empty = np.zeros_like(bits)
+                bits &= np.bitwise_or.reduce([self.bitsets[col].get(value, empty) for value in filters[col]])
+        return np.flatnonzero(np.unpackbits(bits, count=self.rows))
+
+    def _range_bits(self, name: str, low, high):
+        values, order = self.sorted[name]
+        start, end = np.searchsorted(values, low, side="left"), np.searchsorted(values, high, side="right")
+        mask = np.zeros(self.rows, dtype=bool)
+        mask[order[start:end]] = True
+        return np.packbits(mask)
+
+def _sorted_column(values: np.ndarray):
+    order = np.argsort(values, kind="stable")
+    return values[order], order
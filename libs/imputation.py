@@ -0,0 +1,153 @@
+import pandas as pd
+import numpy as np
+from .profiling import profiled
+
+class RunningStats:
+    """
+    Running aggregates behind the values `clear_data` imputes, updated batch by batch instead of being
+    recomputed over the whole history:
+    - number of rows of each "Delivery_person_ID";
+    - histogram of the ratings of each "Delivery_person_ID" (mean rating per rider);
+    - histogram of the ages (median age);
+    - histogram of the pick-up times of each order type (median pick-up time).
+    The histograms hold integer counts and the statistics are read exactly from them, so the statistics of
+    several batches are those of the batches concatenated, whatever the batches.
+    """
+    def __init__(self):
+        self.rows = 0
+        self.riders = pd.Series(dtype=np.int64, index=pd.Index([], dtype=object, name="Delivery_person_ID"))
+        self.ratings = pd.Series(dtype=np.int64, index=pd.MultiIndex.from_tuples([], names=["Delivery_person_ID", "Delivery_person_Ratings"]))
+        self.ages = pd.Series(dtype=np.int64)
+        self.pick_times = pd.Series(dtype=np.int64, index=pd.MultiIndex.from_tuples([], names=["Type_of_order", "Time_to_pick"]))
+
+    def __repr__(self):
+        return f"RunningStats(rows={self.rows}, riders={len(self.riders)})"
+
+    @profiled
+    def update(self, df_aux: pd.DataFrame):
+        """
+        Adds a batch to the running aggregates.
+
+        :param df_aux: Output of `utils._stats_inputs` for the batch.
+        :return: The updated RunningStats.
+        """
+        self.rows += len(df_aux)
+        riders = df_aux.groupby("Delivery_person_ID").size()
+        self.riders = self.riders.add(riders, fill_value=0).astype(np.int64).sort_index()
+        ratings = df_aux[["Delivery_person_ID", "Delivery_person_Ratings"]].dropna().value_counts()
+        self.ratings = self.ratings.add(ratings, fill_value=0).astype(np.int64).sort_index()
+        ages = df_aux["Delivery_person_Age"].dropna().astype(np.float64).value_counts()
+        self.ages = self.ages.add(ages, fill_value=0).astype(np.int64).sort_index()
+        pick_times = df_aux[["Type_of_order", "Time_to_pick"]].dropna().value_counts()
+        self.pick_times = self.pick_times.add(pick_times, fill_value=0).astype(np.int64).sort_index()
+        return self
+
+    def values(self):
+        """
+        Derives the imputation statistics from the running aggregates.
+
+        :return: Dictionary with "age_median", "rating_means" (Series indexed by "Delivery_person_ID"),
+            "pick_time_median" (minutes, of the first order type in alphabetical order) and "service_ids"
+            (sorted "Delivery_person_ID" values).
+        """
+        stats = {}
+        stats["age_median"] = _histogram_median(self.ages)
+        stats["rating_means"] = _histogram_means(self.ratings).rename("Delivery_person_Ratings")
+        if len(self.pick_times):
+            first_type = self.pick_times.index.get_level_values("Type_of_order").min()
+            stats["pick_time_median"] = _histogram_median(self.pick_times.xs(first_type, level="Type_of_order"))
+        else:
+            stats["pick_time_median"] = np.nan
+        stats["service_ids"] = self.riders.index.rename(None)
+        return stats
+
+    def drift(self, other):
+        """
+        Measures how far the imputation statistics moved between two snapshots of the running aggregates.
+        A value imputed with the statistics of `other` differs from the one a full rebuild would impute
+        with those of `self` by at most the drift of its statistic. Ratings left missing because their
+        rider had no rating yet are not covered.
+
+        :param other: Earlier RunningStats.
+        :return: Dictionary with the absolute change of "age_median", "pick_time_median" and the largest
+            absolute change of the mean rating of any rider ("rating_mean").
+        """
+        new, old = self.values(), other.values()
+        ratings = new["rating_means"].sub(old["rating_means"]).abs().max()
+        return {
+            "age_median": float(abs(new["age_median"] - old["age_median"])),
+            "rating_mean": 0.0 if np.isnan(ratings) else float(ratings),
+            "pick_time_median": float(abs(new["pick_time_median"] - old["pick_time_median"])),
+        }
+
+    def to_dict(self):
+        """
+        :return: JSON-serializable dictionary with the running aggregates (see `from_dict`).
+        """
+        return {
+            "rows": self.rows,
+            "riders": [self.riders.index.tolist(), self.riders.tolist()],
+            "ratings": [self.ratings.index.get_level_values(0).tolist(), self.ratings.index.get_level_values(1).tolist(), self.ratings.tolist()],
+            "ages": [self.ages.index.tolist(), self.ages.tolist()],
+            "pick_times": [self.pick_times.index.get_level_values(0).tolist(), self.pick_times.index.get_level_values(1).tolist(), self.pick_times.tolist()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Rebuilds the running aggregates saved by `to_dict`.
+
+        :param data: Dictionary returned by `to_dict`.
+        :return: RunningStats.
+        """
+        running = cls()
+        running.rows = data["rows"]
+        ids, rows = data["riders"]
+        running.riders = pd.Series(rows, index=pd.Index(ids, dtype=object, name="Delivery_person_ID"), dtype=np.int64)
+        ids, ratings, counts = data["ratings"]
+        index = pd.MultiIndex.from_arrays([pd.Index(ids, dtype=object), pd.Index(ratings, dtype=np.float64)], names=["Delivery_person_ID", "Delivery_person_Ratings"])
+        running.ratings = pd.Series(counts, index=index, dtype=np.int64)
+        running.ages = pd.Series(data["ages"][1], index=pd.Index(data["ages"][0], dtype=np.float64), dtype=np.int64)
+        types, times, counts = data["pick_times"]
+        index = pd.MultiIndex.from_arrays([pd.Index(types, dtype=object), pd.Index(times, dtype=np.float64)], names=["Type_of_order", "Time_to_pick"])
+        running.pick_times = pd.Series(counts, index=index, dtype=np.int64)
+        return running
+
+def _histogram_means(counts: pd.Series):
+    """
+    Mean value of each group of a histogram, computed like `groupby().mean()` as the sum divided by the
+    count, with the sum computed exactly and rounded once. Every float is an integer multiple of a power of
+    two, so the sums are accumulated as Python integers in units of the smallest one.
+
+    :param counts: Series of counts indexed by (group, value).
+    :return: Series of means indexed by the sorted groups.
+    """
+    if len(counts) == 0:
+        return pd.Series(dtype=np.float64, index=pd.Index([], dtype=object, name=counts.index.names[0]))
+    values = counts.index.get_level_values(1).to_numpy(dtype=np.float64).tolist()
+    ratios = {value: value.as_integer_ratio() for value in set(values)}
+    scale = max(denominator for _, denominator in ratios.values())
+    units = {value: numerator * (scale // denominator) for value, (numerator, denominator) in ratios.items()}
+    sums = {}
+    for group, value, count in zip(counts.index.get_level_values(0), values, counts.tolist()):
+        sums[group] = sums.get(group, 0) + units[value] * count
+    totals = counts.groupby(level=0).sum()
+    # int / int is correctly rounded, the division by the count is then rounded once more as in pandas.
+    return pd.Series([sums[group] / scale / total for group, total in totals.items()], index=totals.index, dtype=np.float64)
+
+def _histogram_median(counts: pd.Series):
+    """
+    Median of the values of a histogram, averaging the two middle values for an even number of values
+    like `pd.Series.median`.
+
+    :param counts: Series of counts indexed by the sorted values.
+    :return: Median value, or NaN for an empty histogram.
+    """
+    total = counts.sum()
+    if total == 0:
+        return np.nan
+    cumulative = counts.to_numpy().cumsum()
+    values = counts.index.to_numpy(dtype=np.float64)
+    low = values[np.searchsorted(cumulative, (total - 1) // 2, side="right")]
+    high = values[np.searchsorted(cumulative, total // 2, side="right")]
+    return (low + high) / 2
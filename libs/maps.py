@@ -0,0 +1,120 @@
+from .utils import pd, np, LOCATION_COLUMNS
+from .geo import grid_aggregate, grid_cell_size
+from .profiling import profiled
+from .projection import reads
+import folium
+from folium.plugins import HeatMap, FastMarkerCluster
+
+# Center and zoom level every map opens at: the whole of India.
+MAP_CENTER = (20.904992, 79.417227)
+MAP_ZOOM = 5
+# Zoom level the grid cells of `plot_restaurant_locations` are sized for. The cells are as small as at the city
+# scale the restaurants are looked at, 4 zoom levels (16 times) closer than the opening view: at MAP_ZOOM they
+# span 4 pixels and are merged by the marker clustering, while zooming in to a city still separates them.
+RESTAURANT_GRID_ZOOM = MAP_ZOOM + 4
+# Radius of the heatmap points, in pixels, and zoom level the grid cells of `plot_orders_heatmap` are sized for.
+# A binned heatmap looks like the unbinned one while its cells are smaller than the radius: 3 zoom levels above
+# MAP_ZOOM, the cells span 8 pixels at the opening view and 16 pixels one level closer.
+HEATMAP_RADIUS = 20
+HEATMAP_GRID_ZOOM = MAP_ZOOM + 3
+
+# Builds the marker of a grid cell of `plot_restaurant_locations` in the browser, from a
+# [latitude, longitude, restaurants, deliveries] row.
+RESTAURANT_CELL_CALLBACK = """function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindPopup('<div style="max-width: 150px">' + row[0] + '° N, ' + row[1] + '° W<br>'
+        + 'Restaurants: ' + row[2] + '<br>Number of deliveries: ' + row[3] + '</div>', {maxWidth: 350});
+    return marker;
+}"""
+
+@profiled
+@reads("City", "Road_traffic_density", *LOCATION_COLUMNS["Delivery_location"])
+def plot_central_delivery_locations(df: pd.DataFrame):
+    """
+    Generates a map with markers indicating the median delivery locations for each city and traffic density combination.
+    This function processes the DataFrame to extract the median delivery location for each combination of city type and
+    road traffic density. It then plots these locations on a Folium map, with markers displaying the coordinates,
+    city type, and traffic density.
+
+    :param df: DataFrame containing the dataset with "City", "Road_traffic_density", "Delivery_location_latitude" and "Delivery_location_longitude" columns.
+    :return: Folium map object with markers showing the median delivery locations for each city and traffic density combination.
+    """
+    lat, lon = LOCATION_COLUMNS["Delivery_location"]
+    df = df[["City", "Road_traffic_density", lat, lon]].groupby(["City", "Road_traffic_density"], observed=True).median().reset_index()
+    df = df[(df[lat] >= 1) & (df[lon] >= 1)]
+    fig = folium.Map(location=MAP_CENTER, zoom_start=MAP_ZOOM)
+    for index, location_info in df.iterrows():
+        popup_html = f"""
+        <div style="max-width: 150px">
+            {location_info[lat]}° N, {location_info[lon]}° W<br>
+            City type: {location_info['City']}<br>
+            Traffic: {location_info['Road_traffic_density']}
+        </div>
+        """
+        folium.Marker((location_info[lat], location_info[lon]), popup=folium.Popup(popup_html, max_width=350)).add_to(fig)
+    return fig
+
+
+@profiled
+@reads("ID", *LOCATION_COLUMNS["Restaurant_location"])
+def plot_restaurant_locations(df: pd.DataFrame, zoom: int | None = None):
+    """
+    This function processes the DataFrame to filter out invalid restaurant locations (those with coordinates
+    less than 1 in either latitude or longitude, mostly being [0, 0], known as "Null island"). It then groups the data by restaurant location and counts
+    the number of deliveries from each location. The resulting map includes markers for each restaurant
+    location, displaying the coordinates and the number of deliveries.
+    When `zoom` is given (the Dashboard uses `RESTAURANT_GRID_ZOOM`), the locations are instead aggregated
+    into a grid sized for that zoom level (see `geo.grid_aggregate`) and drawn as a single `FastMarkerCluster` layer built from the cell arrays,
+    with one marker per cell showing its number of restaurants and deliveries. The markers and popups are
+    created in the browser and nearby cells are clustered at lower zoom levels, so the size of the map is
+    bounded by the number of grid cells instead of growing with the number of restaurants.
+
+    :param df: DataFrame containing the dataset with "ID", "Restaurant_latitude" and "Restaurant_longitude" columns.
+    :param zoom: Optional zoom level the grid cells are sized for. None draws one marker per restaurant location.
+    :return: Folium map object with markers showing the number of deliveries from each restaurant location.
+    """
+    lat, lon = LOCATION_COLUMNS["Restaurant_location"]
+    df = df[(df[lat] >= 1) & (df[lon] >= 1)]
+    df = df[["ID", lat, lon]].groupby([lat, lon]).count().reset_index()
+    fig = folium.Map(location=MAP_CENTER, zoom_start=MAP_ZOOM)
+    if zoom is not None:
+        cell_lat, cell_lon, restaurants, deliveries = grid_aggregate(df[lat], df[lon], grid_cell_size(zoom), weights=df["ID"])
+        data = list(zip(np.round(cell_lat, 6).tolist(), np.round(cell_lon, 6).tolist(), restaurants.tolist(), deliveries.astype(np.int64).tolist()))
+        FastMarkerCluster(data, callback=RESTAURANT_CELL_CALLBACK).add_to(fig)
+        return fig
+    for index, location_info in df.iterrows():
+        popup_html = f"""
+        <div style="max-width: 150px">
+            {location_info[lat]}° N, {location_info[lon]}° W<br>
+            Number of deliveries: {int(location_info['ID'])}
+        </div>
+        """
+        folium.Marker((location_info[lat], location_info[lon]), popup=folium.Popup(popup_html, max_width=350)).add_to(fig)
+    return fig
+
+@profiled
+@reads(*LOCATION_COLUMNS["Delivery_location"])
+def plot_orders_heatmap(df: pd.DataFrame, zoom: int | None = None):
+    """
+    This function processes the DataFrame to filter out invalid delivery locations (those with coordinates
+    less than 1 in either latitude or longitude, mostly being [0, 0], known as "Null island"). It then
+    extracts the valid delivery locations and plots them on a Folium map using a heatmap. The heatmap
+    visualizes the density of delivery locations.
+    When `zoom` is given (the Dashboard uses `HEATMAP_GRID_ZOOM`), the locations are first binned into a grid
+    sized for that zoom level (see `geo.grid_aggregate`) and only the non-empty cells are sent to the heatmap, weighted by their number of
+    deliveries. The heatmap layer sums the weights of the points falling in each of its screen cells, so
+    the result looks the same while the cells are smaller than the heatmap radius, and the size of the map
+    is bounded by the number of grid cells instead of growing with the number of orders.
+
+    :param df: DataFrame containing the dataset with "Delivery_location_latitude" and "Delivery_location_longitude" columns.
+    :param zoom: Optional zoom level the grid cells are sized for. None sends every delivery location.
+    :return: Folium map object with a heatmap showing the density of delivery locations.
+    """
+    lat, lon = LOCATION_COLUMNS["Delivery_location"]
+    df = df.loc[(df[lat] >= 1) & (df[lon] >= 1), [lat, lon]].to_numpy()
+    if zoom is not None:
+        cell_lat, cell_lon, deliveries, _ = grid_aggregate(df[:, 0], df[:, 1], grid_cell_size(zoom))
+        df = np.column_stack([np.round(cell_lat, 6), np.round(cell_lon, 6), deliveries])
+    fig = folium.Map(location=MAP_CENTER, zoom_start=MAP_ZOOM)
+    HeatMap(data=df, radius=HEATMAP_RADIUS).add_to(fig)
+    return fig
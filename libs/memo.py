@@ -0,0 +1,151 @@
+import hashlib
+import inspect
+import json
+import threading
+from collections import OrderedDict
+from .utils import pd, load_dataset, dataset_version
+from .shared import SharedDataset
+
+def filter_key(filters: dict):
+    """
+    Builds a canonical hash of the Dashboard filter state, so equal selections map to the same key
+    whatever the order in which the values were picked.
+
+    :param filters: Dictionary with the filter state (see `utils.apply_filters`).
+    :return: Hexadecimal SHA-256 digest of the filter state.
+    """
+    canonical = {col: sorted(map(str, value)) if isinstance(value, list) else [str(v) for v in value] for col, value in filters.items()}
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+class MetricsCache:
+    """
+    Thread-safe LRU cache for the results of the metrics and plot functions.
+    Results are keyed on the function, a state key (usually `filter_key` of the filters the DataFrame
+    arguments were built with) and the remaining non-DataFrame arguments. DataFrame arguments are not
+    hashed: they must be fully determined by the state key.
+    Concurrent calls with the same key wait for the first one to finish instead of computing the result again.
+    """
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def call(self, fn, state_key: str, *args, **kwargs):
+        """
+        Returns the cached result of fn(*args, **kwargs) for the state key, computing and storing it on a miss.
+
+        :param fn: Function to call.
+        :param state_key: Key of the state the DataFrame arguments were built from.
+        :return: Result of the function call.
+        """
+        key = (fn.__module__, fn.__qualname__, state_key, _arguments_key(args, kwargs))
+        while True:
+            with self._lock:
+                if key in self._data:
+                    self.hits += 1
+                    self._data.move_to_end(key)
+                    return self._data[key]
+                pending = self._pending.get(key)
+                if pending is None:
+                    self.misses += 1
+                    self._pending[key] = threading.Event()
+                    break
+            pending.wait()
+        try:
+            result = fn(*args, **kwargs)
+            with self._lock:
+                self._data[key] = result
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        finally:
+            with self._lock:
+                self._pending.pop(key).set()
+        return result
+
+    def stats(self):
+        """
+        :return: Dictionary with the number of hits, misses, cached entries and the maximum size.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+    def evict(self, state_prefix: str):
+        """
+        Drops the cached results whose state key starts with a prefix, e.g. every result computed on an
+        outdated dataset.
+
+        :param state_prefix: Prefix of the state keys to drop.
+        :return: Number of results dropped.
+        """
+        with self._lock:
+            stale = [key for key in self._data if key[2].startswith(state_prefix)]
+            for key in stale:
+                del self._data[key]
+        return len(stale)
+
+    def clear(self):
+        """
+        Drops every cached result and resets the counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+def _arguments_key(args: tuple, kwargs: dict):
+    args = [None if isinstance(arg, pd.DataFrame) else arg for arg in args]
+    kwargs = {name: None if isinstance(arg, pd.DataFrame) else arg for name, arg in kwargs.items()}
+    return json.dumps([args, kwargs], sort_keys=True, default=str)
+
+metrics_cache = MetricsCache(maxsize=128)
+dataset_cache = MetricsCache(maxsize=8)
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+def load_dataset_cached(*args, **kwargs):
+    """
+    Process-wide cached `load_dataset`: the clean dataset is loaded once and shared by every rerun and session.
+    Each call checks the `utils.dataset_version` of its files, so a changed raw CSV or appended orders are
+    loaded by the next call, and the results cached for the previous version are dropped from `dataset_cache`
+    and `metrics_cache`. The returned DataFrame must not be modified in place.
+
+    :return: Clean DataFrame.
+    """
+    return dataset_cache.call(load_dataset, _current_version(args, kwargs), *args, **kwargs)
+
+def load_dashboard_data(*args, store_path: str | None = "./data/dataset_clear.columns", **kwargs):
+    """
+    Process-wide cached clean dataset and the structures the Dashboard filters it with: the rollup cube
+    and the filter indexes of both. They are built once per dataset version (see `load_dataset_cached`)
+    and shared by every rerun and session.
+    The dataset is opened from its memory-mapped columnar store (see `columnar.read_columns`), rewritten from
+    the Parquet cache when missing or stale. With `store_path=None` it is read from the Parquet cache instead.
+    Other arguments are passed to `load_dataset`.
+
+    :return: `shared.SharedDataset`, whose `version` starts the state keys of the metrics computed on it.
+    """
+    kwargs["store_path"] = store_path
+    version = _current_version(args, kwargs)
+    return dataset_cache.call(SharedDataset, f"{version}:{_arguments_key(args, kwargs)}", load_dataset_cached(*args, **kwargs), version=version)
+
+def _current_version(args: tuple, kwargs: dict):
+    """
+    :return: Version of the dataset files `load_dataset(*args, **kwargs)` reads. When it changed since the
+        last call for the same files, the results cached for the previous version are dropped.
+    """
+    paths = inspect.signature(load_dataset).bind(*args, **kwargs)
+    paths.apply_defaults()
+    files = (paths.arguments["raw_path"], paths.arguments["cache_path"])
+    version = dataset_version(*files)
+    with _versions_lock:
+        previous = _versions.get(files)
+        _versions[files] = version
+    if previous is not None and previous != version:
+        dataset_cache.evict(previous)
+        metrics_cache.evict(previous)
+    return version
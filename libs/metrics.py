@@ -1,10 +1,14 @@
-from .utils import pd, np, stringfy_time
+from .utils import pd, np, stringfy_time, LOCATION_COLUMNS
+from .rollup import as_rollup, weekly_orders, ROLLUP_SOURCE_COLUMNS, ROLLUP_PRESENCE
+from .spatial import SpatialIndex
+from .profiling import profiled
+from .projection import reads
 import plotly.express as px
 import plotly.subplots as ps
-import folium
-from folium.plugins import HeatMap
 
-def get_metrics_company(df: pd.DataFrame):
+@profiled
+@reads(*ROLLUP_SOURCE_COLUMNS)
+def get_metrics_company(df: pd.DataFrame, rollup: pd.DataFrame | None = None):
     """
     This function processes the DataFrame to compute several company key metrics:
     - Number of unique restaurants.
@@ -17,23 +21,21 @@ def get_metrics_company(df: pd.DataFrame):
     - Mean number of deliveries per week.
     - Standard deviation of the number of deliveries per week.
     - Mean difference in the number of deliveries between consecutive weeks.
+    Every metric is answered from the rollup cube, whose slices are split by restaurant location (see `rollup.ROLLUP_PRESENCE`).
 
-    :param df: DataFrame containing the dataset with "ID", "Restaurant_location", "Delivery_person_ID", and "Day_Ordered" columns.
+    :param df: DataFrame containing the dataset with "Time_Ordered" and the other `rollup.ROLLUP_SOURCE_COLUMNS`, or a rollup cube.
+    :param rollup: Rollup cube of the same orders (see `rollup.build_rollup`). Built from df if not given.
     :return: Dictionary containing the calculated metrics.
     """
     metrics = {}
-    df_aux = df[["ID", "Restaurant_location"]].groupby("Restaurant_location").count().reset_index()
-    metrics["restaurants"] = df_aux["Restaurant_location"].nunique()
-    metrics["mean_orders_per_restaurant"] = df_aux["ID"].mean()
-    df_aux = df[["Delivery_service_ID", "ID"]].groupby("Delivery_service_ID").count().reset_index()
+    rollup = as_rollup(df if rollup is None else rollup)
+    df_aux = rollup.groupby(ROLLUP_PRESENCE)["Orders"].sum().reset_index()
+    metrics["restaurants"] = len(df_aux)
+    metrics["mean_orders_per_restaurant"] = df_aux["Orders"].mean()
+    df_aux = rollup.groupby("Delivery_service_ID", observed=True)["Orders"].sum().reset_index()
     metrics["delivery_services"] = df_aux["Delivery_service_ID"].nunique()
-    metrics["mean_deliveries_per_service"] = df_aux["ID"].mean()
-    df_aux = df
-    df["Day_Ordered"] = pd.to_datetime(df["Time_Ordered"]).dt.date
-    df_aux["Week_Ordered"] = pd.to_datetime(df_aux["Day_Ordered"]).dt.strftime("%W").astype(int)
-    df_aux = df_aux[["Week_Ordered", "ID"]].pivot_table(index="Week_Ordered", aggfunc="count").reset_index()
-    all_weeks = pd.DataFrame({"Week_Ordered": range(df_aux["Week_Ordered"].min(), df_aux["Week_Ordered"].max() + 1)})
-    df_aux = pd.merge(all_weeks, df_aux, on="Week_Ordered", how="left").fillna(0)
+    metrics["mean_deliveries_per_service"] = df_aux["Orders"].mean()
+    df_aux = weekly_orders(rollup)
     metrics["total_deliveries"] = df_aux["ID"].sum()
     metrics["week_max_deliveries"] = df_aux["ID"].max()
     metrics["week_min_deliveries"] = df_aux["ID"].min()
@@ -42,6 +44,8 @@ def get_metrics_company(df: pd.DataFrame):
     metrics["week_mean_diff_deliveries"] = df_aux["ID"].diff().mean()
     return metrics
 
+@profiled
+@reads("Delivery_person_Ratings", "Distance(km)", "Time_taken(min)")
 def get_metrics_deliveries(df: pd.DataFrame):
     """
     This function processes the DataFrame to compute several delivery-related metrics:
@@ -68,6 +72,8 @@ def get_metrics_deliveries(df: pd.DataFrame):
     metrics["delivery_time_std_dev"] = stringfy_time(df["Time_taken(min)"].std())
     return metrics
 
+@profiled
+@reads("Pick_time(min)")
 def get_metrics_restaurants(df: pd.DataFrame):
     """
     This function processes the DataFrame to compute several restaurant-related metrics:
@@ -86,6 +92,8 @@ def get_metrics_restaurants(df: pd.DataFrame):
     metrics["Pick_time_std_dev"] = stringfy_time(df["Pick_time(min)"].std())
     return metrics
 
+@profiled
+@reads("Delivery_service_ID", "Delivery_person_Ratings")
 def get_mean_ratings_by_service(df: pd.DataFrame):
     """
     This function processes the DataFrame to calculate the mean rating for each delivery person.
@@ -96,10 +104,12 @@ def get_mean_ratings_by_service(df: pd.DataFrame):
     :param df: DataFrame containing the dataset with "Delivery_person_ID" and "Delivery_person_Ratings" columns.
     :return: DataFrame with the mean rating for each delivery person, sorted by rating in descending order.
     """
-    df = df[["Delivery_service_ID", "Delivery_person_Ratings"]].groupby("Delivery_service_ID").mean().round(2).sort_values(by="Delivery_person_Ratings", ascending=False).rename(columns={"Delivery_person_Ratings": "Mean_rating"}).reset_index()
+    df = df[["Delivery_service_ID", "Delivery_person_Ratings"]].groupby("Delivery_service_ID", observed=True).mean().round(2).sort_values(by="Delivery_person_Ratings", ascending=False).rename(columns={"Delivery_person_Ratings": "Mean_rating"}).reset_index()
     df.index = df.index +1
     return df
 
+@profiled
+@reads("Road_traffic_density", "Delivery_person_Ratings")
 def get_means_ratings_by_traffic(df: pd.DataFrame):
     """
     This function processes the DataFrame to calculate the mean and standard deviation of delivery person ratings
@@ -109,12 +119,14 @@ def get_means_ratings_by_traffic(df: pd.DataFrame):
     :param df: DataFrame containing the dataset with "Delivery_person_Ratings" and "Road_traffic_density" columns.
     :return: DataFrame with the mean and standard deviation of delivery person ratings for each traffic density category.
     """
-    df = df[["Delivery_person_Ratings", "Road_traffic_density"]].groupby("Road_traffic_density").agg({"Delivery_person_Ratings": ["mean", "std"]})
+    df = df[["Delivery_person_Ratings", "Road_traffic_density"]].groupby("Road_traffic_density", observed=True).agg({"Delivery_person_Ratings": ["mean", "std"]})
     df.columns = ["Mean_Rating", "Std_Rating"]
     df.reset_index(inplace=True)
     df.index = df.index +1
     return df
 
+@profiled
+@reads("Weatherconditions", "Delivery_person_Ratings")
 def get_mean_ratings_by_weather(df: pd.DataFrame):
     """
     This function processes the DataFrame to calculate the mean and standard deviation of delivery person ratings
@@ -124,12 +136,14 @@ def get_mean_ratings_by_weather(df: pd.DataFrame):
     :param df: DataFrame containing the dataset with "Delivery_person_Ratings" and "Weatherconditions" columns.
     :return: DataFrame with the mean and standard deviation of delivery person ratings for each weather condition category.
     """
-    df = df[["Delivery_person_Ratings", "Weatherconditions"]].groupby("Weatherconditions").agg({"Delivery_person_Ratings": ["mean", "std"]})
+    df = df[["Delivery_person_Ratings", "Weatherconditions"]].groupby("Weatherconditions", observed=True).agg({"Delivery_person_Ratings": ["mean", "std"]})
     df.columns = ["Mean_Rating", "Std_Rating"]
     df.reset_index(inplace=True)
     df.index = df.index +1
     return df
 
+@profiled
+@reads("Delivery_service_ID", "Velocity(km/h)")
 def get_top_10_fastest_deliveries(df: pd.DataFrame, reverse: bool=False):
     """
     This function processes the DataFrame to calculate the mean velocity for each delivery person,
@@ -141,11 +155,13 @@ def get_top_10_fastest_deliveries(df: pd.DataFrame, reverse: bool=False):
     :param reverse: Boolean flag to determine the sorting order. If True, sorts in ascending order; if False, sorts in descending order.
     :return: DataFrame with the top 10 delivery persons sorted by their mean velocity.
     """
-    df = df[["Delivery_service_ID", "Velocity(km/h)"]].groupby("Delivery_service_ID").mean().sort_values("Velocity(km/h)", ascending=reverse).reset_index()
+    df = df[["Delivery_service_ID", "Velocity(km/h)"]].groupby("Delivery_service_ID", observed=True).mean().sort_values("Velocity(km/h)", ascending=reverse).reset_index()
     df = df.head(10).reset_index(drop=True)
     df.index = df.index +1
     return df
 
+@profiled
+@reads("City", "Pick_time(min)")
 def get_mean_pick_time_by_city(df: pd.DataFrame):
     """
     This function processes the DataFrame to calculate the mean and standard deviation of pick-up times
@@ -155,11 +171,13 @@ def get_mean_pick_time_by_city(df: pd.DataFrame):
     :param df: DataFrame containing the dataset with "Pick_time(min)" and "City" columns.
     :return: DataFrame with the mean and standard deviation of pick-up times for each city.
     """
-    df = df[["Pick_time(min)", "City"]].groupby("City").agg(["mean", "std"]).reset_index()
+    df = df[["Pick_time(min)", "City"]].groupby("City", observed=True).agg(["mean", "std"]).reset_index()
     df.columns = ["City", "Mean_time", "Std_time"]
     df[["Mean_time", "Std_time"]] = stringfy_time(df[["Mean_time", "Std_time"]])
     return df
 
+@profiled
+@reads("Type_of_order", "Pick_time(min)")
 def get_mean_pick_time_by_order(df: pd.DataFrame):
     """
     This function processes the DataFrame to calculate the mean and standard deviation of pick-up times
@@ -169,11 +187,13 @@ def get_mean_pick_time_by_order(df: pd.DataFrame):
     :param df: DataFrame containing the dataset with "Pick_time(min)" and "Type_of_order" columns.
     :return: DataFrame with the mean and standard deviation of pick-up times for each type of order.
     """
-    df = df[["Pick_time(min)", "Type_of_order"]].groupby(["Type_of_order"]).agg(["mean", "std"]).reset_index()
+    df = df[["Pick_time(min)", "Type_of_order"]].groupby(["Type_of_order"], observed=True).agg(["mean", "std"]).reset_index()
     df.columns = ["Type_of_order", "Mean_time", "Std_time"]
     df[["Mean_time", "Std_time"]] = stringfy_time(df[["Mean_time", "Std_time"]])
     return df
 
+@profiled
+@reads("Road_traffic_density", "Pick_time(min)")
 def get_mean_pick_time_by_traffic(df: pd.DataFrame):
     """
     This function processes the DataFrame to calculate the mean and standard deviation of pick-up times
@@ -183,11 +203,78 @@ def get_mean_pick_time_by_traffic(df: pd.DataFrame):
     :param df: DataFrame containing the dataset with "Pick_time(min)" and "Road_traffic_density" columns.
     :return: DataFrame with the mean and standard deviation of pick-up times for each traffic density category.
     """
-    df = df[["Pick_time(min)", "Road_traffic_density"]].groupby(["Road_traffic_density"]).agg(["mean", "std"]).reset_index()
+    df = df[["Pick_time(min)", "Road_traffic_density"]].groupby(["Road_traffic_density"], observed=True).agg(["mean", "std"]).reset_index()
     df.columns = ["Road_traffic_density", "Mean_time", "Std_time"]
     df[["Mean_time", "Std_time"]] = stringfy_time(df[["Mean_time", "Std_time"]])
     return df
 
+@profiled
+@reads("ID", *LOCATION_COLUMNS["Restaurant_location"], *LOCATION_COLUMNS["Delivery_location"])
+def get_orders_near_restaurants(df: pd.DataFrame, radius_km: float = 5.0, index: SpatialIndex | None = None):
+    """
+    This function counts, for each restaurant location, the orders delivered within a radius of it (whatever
+    restaurant they came from), as a measure of the demand around each restaurant, and returns the 10
+    locations with the most nearby orders.
+
+    :param df: DataFrame containing the dataset with "ID", "Restaurant_latitude", "Restaurant_longitude", "Delivery_location_latitude" and "Delivery_location_longitude" columns.
+    :param radius_km: Radius around each restaurant, in kilometers.
+    :param index: Spatial index over the delivery locations of df (see `spatial.SpatialIndex`). Built from df if not given.
+    :return: DataFrame with the restaurant coordinates, their number of orders and the number of orders delivered within the radius.
+    """
+    if index is None:
+        index = SpatialIndex(df, "Delivery_location")
+    lat, lon = LOCATION_COLUMNS["Restaurant_location"]
+    df = df.loc[(df[lat] >= 1) & (df[lon] >= 1), ["ID", lat, lon]].groupby([lat, lon]).count().rename(columns={"ID": "Orders"}).reset_index()
+    df["Orders_within_radius"] = [len(index.within(la, lo, radius_km)[0]) for la, lo in zip(df[lat].tolist(), df[lon].tolist())]
+    df = df.sort_values("Orders_within_radius", ascending=False, kind="stable").head(10).reset_index(drop=True)
+    df.index = df.index +1
+    return df
+
+@profiled
+@reads("ID", *LOCATION_COLUMNS["Restaurant_location"])
+def get_restaurant_density(df: pd.DataFrame, radius_km: float = 5.0, index: SpatialIndex | None = None):
+    """
+    This function computes the density of restaurants around each restaurant location: the number of
+    restaurant locations within a radius of it (itself included) and the same number per 100 km², and returns
+    the 10 densest locations.
+
+    :param df: DataFrame containing the dataset with "ID", "Restaurant_latitude" and "Restaurant_longitude" columns.
+    :param radius_km: Radius around each restaurant, in kilometers.
+    :param index: Spatial index over the distinct restaurant locations of df (see `spatial.SpatialIndex` with `unique=True`). Built from df if not given.
+    :return: DataFrame with the restaurant coordinates, the number of restaurants within the radius and the density per 100 km².
+    """
+    if index is None:
+        index = SpatialIndex(df, "Restaurant_location", unique=True)
+    lat, lon = LOCATION_COLUMNS["Restaurant_location"]
+    df = index.points[[lat, lon]].copy()
+    df["Restaurants_within_radius"] = [len(index.within(la, lo, radius_km)[0]) for la, lo in zip(df[lat].tolist(), df[lon].tolist())]
+    df["Density(per 100 km²)"] = df["Restaurants_within_radius"] / (np.pi * radius_km ** 2) * 100
+    df = df.sort_values("Restaurants_within_radius", ascending=False, kind="stable").head(10).reset_index(drop=True)
+    df.index = df.index +1
+    return df
+
+@profiled
+@reads("ID", *LOCATION_COLUMNS["Restaurant_location"])
+def get_nearest_restaurants(df: pd.DataFrame, lat: float, lon: float, k: int = 5, index: SpatialIndex | None = None):
+    """
+    This function finds the k restaurant locations closest to a coordinate.
+
+    :param df: DataFrame containing the dataset with "ID", "Restaurant_latitude" and "Restaurant_longitude" columns.
+    :param lat: Latitude of the point, in degrees.
+    :param lon: Longitude of the point, in degrees.
+    :param k: Number of restaurants to return.
+    :param index: Spatial index over the distinct restaurant locations of df (see `spatial.SpatialIndex` with `unique=True`). Built from df if not given.
+    :return: DataFrame with the restaurant coordinates, their number of orders and their distance to the point, closest first.
+    """
+    if index is None:
+        index = SpatialIndex(df, "Restaurant_location", unique=True)
+    positions, distances = index.nearest(lat, lon, k)
+    df = index.points.iloc[positions].reset_index(drop=True)
+    df["Distance(km)"] = distances
+    df.index = df.index +1
+    return df
+
+@profiled
 def plot_histogram(df: pd.DataFrame):
     """
     Plot a histogram for each numerical value in the given DataFrame.
@@ -208,6 +295,7 @@ def plot_histogram(df: pd.DataFrame):
     yaxis={"title_font": {"size": 18}, "showgrid": True})
     return fig
 
+@profiled
 def plot_correlation(df: pd.DataFrame, wid: int = 600, hei: int = 800):
     correlation_matrix = df.select_dtypes(include=[np.number, bool]).corr()
     fig = px.imshow(correlation_matrix,
@@ -234,43 +322,42 @@ def plot_correlation(df: pd.DataFrame, wid: int = 600, hei: int = 800):
                     width=wid, height=hei, annotations=annotations)
     return fig
 
+@profiled
+@reads(*ROLLUP_SOURCE_COLUMNS)
 def plot_orders_per_day(df: pd.DataFrame):
     """
-    This function processes the cleaned DataFrame to extract the date of each order,
-    counts the number of orders per day, and then plots these counts using a bar chart.
+    This function sums the orders of the rollup cube per day, and then plots these counts using a bar chart.
     
-    :param df_clear: DataFrame containing the cleaned dataset with a "Time_Ordered" column.
+    :param df: Rollup cube (see `rollup.build_rollup`), or DataFrame containing the cleaned dataset with a "Time_Ordered" column.
     :return: Plotly figure object with the bar chart showing the number of orders per day.
     """
-    df["Day_Ordered"] = pd.to_datetime(df["Time_Ordered"]).dt.date
-    df = df[["ID", "Day_Ordered"]].groupby("Day_Ordered").count().reset_index()
-    df = df[["Day_Ordered", "ID"]].pivot_table(index="Day_Ordered", aggfunc="sum").reset_index()
+    df = as_rollup(df).groupby("Day_Ordered")["Orders"].sum().rename("ID").reset_index()
+    df["Day_Ordered"] = df["Day_Ordered"].dt.date
     fig = px.bar(df, x="Day_Ordered", y="ID", title="Daily orders", labels={"Day_Ordered": "Date", "ID": "Quantity"})
     fig.update_layout(title={"x": 0.5, "xanchor": "center", "font": {"size": 24}},
         xaxis={"title_font": {"size": 18}, "showgrid": True},
         yaxis={"title_font": {"size": 18}, "showgrid": True})
     return fig
 
+@profiled
+@reads(*ROLLUP_SOURCE_COLUMNS)
 def plot_orders_per_week(df: pd.DataFrame):
     """
-    This function processes the DataFrame to extract the week number for each order,
-    counts the number of orders per week, and then plots these counts using a line chart.
+    This function sums the orders of the rollup cube per week, and then plots these counts using a line chart.
 
-    :param df: DataFrame containing the dataset with a "Day_Ordered" column.
+    :param df: Rollup cube (see `rollup.build_rollup`), or DataFrame containing the cleaned dataset with a "Time_Ordered" column.
     :return: A tuple containing:
         - Plotly figure object with the line chart showing the number of orders per week.
     """
-    df["Day_Ordered"] = pd.to_datetime(df["Time_Ordered"]).dt.date
-    df["Week_Ordered"] = pd.to_datetime(df["Day_Ordered"]).dt.strftime("%W").astype(int)
-    df = df[["Week_Ordered", "ID"]].pivot_table(index="Week_Ordered", aggfunc="count").reset_index()
-    all_weeks = pd.DataFrame({"Week_Ordered": range(df["Week_Ordered"].min(), df["Week_Ordered"].max() + 1)})
-    df = pd.merge(all_weeks, df, on="Week_Ordered", how="left").fillna(0)
+    df = weekly_orders(as_rollup(df))
     fig = px.line(df, x="Week_Ordered", y="ID", title="Weekly orders", labels={"Week_Ordered": "Week of the year", "ID": "Orders"}, markers=True)
     fig.update_layout(title={"x": 0.5, "xanchor": "center", "font": {"size": 24}},
         xaxis={"title_font": {"size": 18}, "showgrid": True},
         yaxis={"title_font": {"size": 18}, "showgrid": True})
     return fig
 
+@profiled
+@reads("ID", "Road_traffic_density")
 def plot_orders_by_traffic(df: pd.DataFrame):
     """
     This function processes the DataFrame to count the number of orders for each traffic density category,
@@ -279,7 +366,7 @@ def plot_orders_by_traffic(df: pd.DataFrame):
     :param df: DataFrame containing the dataset with an "ID" column and a "Road_traffic_density" column.
     :return: Plotly figure object with the pie chart showing the distribution of orders by traffic density.
     """
-    df = df[["ID", "Road_traffic_density"]].groupby("Road_traffic_density").count().reset_index()
+    df = df[["ID", "Road_traffic_density"]].groupby("Road_traffic_density", observed=True).count().reset_index()
     df["percent"] = df["ID"] / df["ID"].sum()
     fig = px.pie(df, values="percent", names="Road_traffic_density", title="Orders distribution by traffic density")
     fig.update_layout(width=700, height=500,
@@ -287,6 +374,8 @@ def plot_orders_by_traffic(df: pd.DataFrame):
         legend={"font": {"size": 18}})
     return fig
 
+@profiled
+@reads("ID", "City", "Road_traffic_density")
 def plot_orders_by_traffic_and_city_type(df: pd.DataFrame, log: bool=False):
     """
     This function processes the DataFrame to count the number of orders for each combination of city type and road traffic density.
@@ -297,23 +386,25 @@ def plot_orders_by_traffic_and_city_type(df: pd.DataFrame, log: bool=False):
     :param log: Boolean flag to determine if the y-axis should be on a logarithmic scale. If True, the y-axis is logarithmic; if False, it is linear.
     :return: Plotly figure object with the bar chart showing the number of orders by city type and traffic density.
     """
-    df = df[["ID", "City", "Road_traffic_density"]].groupby(["City", "Road_traffic_density"]).count().reset_index()
+    df = df[["ID", "City", "Road_traffic_density"]].groupby(["City", "Road_traffic_density"], observed=True).count().reset_index()
     fig = px.bar(df, x="City", y="ID", color="Road_traffic_density", title="Orders by city type grouped by traffic density", labels={"City": "City type", "ID": "Quantity", "Road_traffic_density": "Traffic"}, barmode="stack", log_y=log)
     fig.update_layout(title={"x": 0.5, "xanchor": "center", "font": {"size": 24}},
         xaxis={"title_font": {"size": 18}, "showgrid": True},
         yaxis={"title_font": {"size": 18}, "showgrid": True})
     return fig
 
+@profiled
+@reads(*ROLLUP_SOURCE_COLUMNS)
 def plot_weekly_orders_per_service(df: pd.DataFrame):
     """
     This function processes the DataFrame to calculate the total number of orders and the number of unique delivery services
     for each week. It then computes the average number of orders per delivery service for each week and plots these values
     using a line chart. The chart includes hover data showing the total number of orders and the number of actively delivery services for each week.
 
-    :param df: DataFrame containing the dataset with "Week_Ordered" and "Delivery_service_ID" columns.
+    :param df: Rollup cube (see `rollup.build_rollup`), or DataFrame containing the cleaned dataset with "Time_Ordered" and "Delivery_service_ID" columns.
     :return: Plotly figure object with the line chart showing the average number of orders per delivery service per week.
     """
-    df = df.groupby(["Week_Ordered", "Delivery_service_ID"]).size().reset_index(name="ID_Count")
+    df = as_rollup(df).groupby(["Week_Ordered", "Delivery_service_ID"], observed=True)["Orders"].sum().reset_index(name="ID_Count")
     df = df.groupby("Week_Ordered").agg({"ID_Count": "sum", "Delivery_service_ID": "nunique"}).reset_index()
     df["Order_by_delivery"] = df["ID_Count"] / df["Delivery_service_ID"]
     all_weeks = pd.DataFrame({"Week_Ordered": range(df["Week_Ordered"].min(), df["Week_Ordered"].max() + 1)})
@@ -324,74 +415,8 @@ def plot_weekly_orders_per_service(df: pd.DataFrame):
         yaxis={"title_font": {"size": 18}, "showgrid": True})
     return fig
 
-def plot_central_delivery_locations(df: pd.DataFrame):
-    """
-    Generates a map with markers indicating the median delivery locations for each city and traffic density combination.
-    This function processes the DataFrame to extract the median delivery location for each combination of city type and
-    road traffic density. It then plots these locations on a Folium map, with markers displaying the coordinates,
-    city type, and traffic density.
-
-    :param df: DataFrame containing the dataset with "City", "Road_traffic_density", and "Delivery_location" columns.
-    :return: Folium map object with markers showing the median delivery locations for each city and traffic density combination.
-    """
-    df = df[["City", "Road_traffic_density", "Delivery_location"]].copy()
-    df[["Delivery_location_x", "Delivery_location_y"]] = pd.DataFrame(df["Delivery_location"].tolist(), index=df.index)
-    df = df.drop(columns=["Delivery_location"])
-    df = df.groupby(["City", "Road_traffic_density"]).median().reset_index()
-    df["Delivery_location"] = list(zip(df["Delivery_location_x"], df["Delivery_location_y"]))
-    df = df.drop(columns=["Delivery_location_x", "Delivery_location_y"])
-    df = df[df["Delivery_location"].apply(lambda loc: float(loc[0]) >= 1 and float(loc[1]) >= 1)]
-    fig = folium.Map(location=(20.904992, 79.417227), zoom_start=5)
-    for index, location_info in df.iterrows():
-        popup_html = f"""
-        <div style="max-width: 150px">
-            {location_info["Delivery_location"][0]}° N, {location_info["Delivery_location"][1]}° W<br>
-            City type: {location_info['City']}<br>
-            Traffic: {location_info['Road_traffic_density']}
-        </div>
-        """
-        folium.Marker(location_info["Delivery_location"], popup=folium.Popup(popup_html, max_width=350)).add_to(fig)
-    return fig
-
-
-def plot_restaurant_locations(df: pd.DataFrame):
-    """
-    This function processes the DataFrame to filter out invalid restaurant locations (those with coordinates
-    less than 1 in either latitude or longitude, mostly being [0, 0], known as "Null island"). It then groups the data by restaurant location and counts
-    the number of deliveries from each location. The resulting map includes markers for each restaurant
-    location, displaying the coordinates and the number of deliveries.
-
-    :param df: DataFrame containing the dataset with "ID" and "Restaurant_location" columns.
-    :return: Folium map object with markers showing the number of deliveries from each restaurant location.
-    """
-    df = df[df["Restaurant_location"].apply(lambda loc: float(loc[0]) >= 1 and float(loc[1]) >= 1)]
-    df = df[["ID", "Restaurant_location"]].groupby("Restaurant_location").count().reset_index()
-    fig = folium.Map(location=(20.904992, 79.417227), zoom_start=5)
-    for index, location_info in df.iterrows():
-        popup_html = f"""
-        <div style="max-width: 150px">
-            {location_info['Restaurant_location'][0]}° N, {location_info['Restaurant_location'][1]}° W<br>
-            Number of deliveries: {location_info['ID']}
-        </div>
-        """
-        folium.Marker(location_info["Restaurant_location"], popup=folium.Popup(popup_html, max_width=350)).add_to(fig)
-    return fig
-
-def plot_orders_heatmap(df: pd.DataFrame):
-    """
-    This function processes the DataFrame to filter out invalid delivery locations (those with coordinates
-    less than 1 in either latitude or longitude, mostly being [0, 0], known as "Null island"). It then
-    extracts the valid delivery locations and plots them on a Folium map using a heatmap. The heatmap
-    visualizes the density of delivery locations.
-
-    :param df: DataFrame containing the dataset with "Delivery_location" column.
-    :return: Folium map object with a heatmap showing the density of delivery locations.
-    """
-    df = df[df["Delivery_location"].apply(lambda loc: loc[0] >= 1 and loc[1] >= 1)]["Delivery_location"].to_numpy()
-    fig = folium.Map(location=(20.904992, 79.417227), zoom_start=5)
-    HeatMap(data=df, radius=20).add_to(fig)
-    return fig
-
+@profiled
+@reads("ID", "Delivery_person_Age")
 def plot_deliveries_by_age(df: pd.DataFrame):
     """
     This function processes the DataFrame to count the number of deliveries for each delivery person age,
@@ -407,6 +432,8 @@ def plot_deliveries_by_age(df: pd.DataFrame):
         yaxis={"title_font": {"size": 18}, "showgrid": True})
     return fig
 
+@profiled
+@reads("ID", "Vehicle_condition")
 def plot_deliveries_by_vehicle_condition(df: pd.DataFrame):
     """
     This function processes the DataFrame to count the number of deliveries for each vehicle condition,
@@ -0,0 +1,86 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .profiling import propagate_profiling
+
+_lock = threading.Lock()
+_executors = {}
+
+class PanelScheduler:
+    """
+    Computes the independent panels of a page concurrently and renders each one as soon as it is ready.
+    `submit` starts the computation of a panel in a thread pool shared by every session of the process, and
+    `run` (or leaving the `with` block) calls the render function of each panel with its result, in the
+    calling thread, in the order the computations finish. The page layout is created before submitting, so
+    each render function writes into its own placeholder whatever the order.
+    Threads are used rather than processes, so the panels read the shared dataset (see
+    `shared.SharedDataset`) and return figures without pickling them. Most NumPy and pandas kernels
+    release the GIL; the Python parts of the panels still run one at a time.
+    """
+    def __init__(self, max_workers: int = 4):
+        """
+        :param max_workers: Number of threads of the pool. With 1 or less, the panels are computed one after
+            another by `run`, in the order they were submitted.
+        """
+        self.max_workers = max_workers
+        self._pool = _executor(max_workers) if max_workers > 1 else None
+        self._panels = []
+
+    def __repr__(self):
+        return f"PanelScheduler(max_workers={self.max_workers}, pending={len(self._panels)})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.run()
+        else:
+            for future, *_ in self._panels:
+                if future is not None:
+                    future.cancel()
+            self._panels = []
+
+    def submit(self, render, fn, *args, **kwargs):
+        """
+        Starts computing a panel.
+
+        :param render: Function called with the result of fn, in the thread calling `run`.
+        :param fn: Function computing the panel. It runs in another thread, so it must not call Streamlit.
+        :return: None
+        """
+        future = self._pool.submit(propagate_profiling(fn), *args, **kwargs) if self._pool is not None else None
+        self._panels.append((future, render, fn, args, kwargs))
+        return None
+
+    def run(self):
+        """
+        Renders the submitted panels as their computations finish. A panel whose computation failed does not
+        stop the others: the first error is raised once every other panel is rendered.
+
+        :return: Number of panels rendered.
+        """
+        panels, self._panels = self._panels, []
+        if self._pool is None:
+            results = ((render, lambda fn=fn, args=args, kwargs=kwargs: fn(*args, **kwargs)) for _, render, fn, args, kwargs in panels)
+        else:
+            renders = {future: render for future, render, *_ in panels}
+            results = ((renders[future], future.result) for future in as_completed(renders))
+        error = None
+        rendered = 0
+        for render, result in results:
+            try:
+                value = result()
+            except Exception as e:
+                error = error or e
+                continue
+            render(value)
+            rendered += 1
+        if error is not None:
+            raise error
+        return rendered
+
+def _executor(max_workers: int):
+    with _lock:
+        if max_workers not in _executors:
+            _executors[max_workers] = ThreadPoolExecutor(max_workers, thread_name_prefix="panels")
+        return _executors[max_workers]
@@ -0,0 +1,239 @@
+import functools
+import json
+import threading
+import time
+import tracemalloc
+import uuid
+import pandas as pd
+
+class _State(threading.local):
+    # Class attribute, so threads that never started a run read None without a failed attribute lookup.
+    run = None
+
+_state = _State()
+
+class _Stack(threading.local):
+    def __init__(self):
+        self.frames = []
+
+class ProfileRun:
+    """
+    Timings of the profiled calls made during one Dashboard rerun (or any other unit of work).
+    While a run is active in a thread (see `start_profiling`), every call to a `profiled` function or `profile_step`
+    block in that thread is recorded with its wall time, the rows of its first DataFrame argument and of its
+    result, and, when `memory` is True, the peak of the memory traced by `tracemalloc` above the memory in use
+    when it started. Without an active run, profiled functions only pay one thread-local lookup.
+    Functions handed to other threads are recorded in the run too when wrapped with `propagate_profiling`;
+    the peak memory of calls running concurrently in several threads then includes each other's allocations.
+    """
+    def __init__(self, label: str = "", memory: bool = False):
+        """
+        :param label: Name of the run, stored with its records.
+        :param memory: If True, traces the memory allocations of the run with `tracemalloc`, which slows it down.
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.memory = memory
+        self.records = []
+        self.started = None
+        self.seconds = None
+        self._stacks = _Stack()
+        self._traced = False
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"ProfileRun(label={self.label!r}, records={len(self.records)})"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        """
+        Makes this run the active run of the current thread, stopping the run left active in it, if any
+        (a Streamlit rerun interrupted by a widget change never reaches its end).
+
+        :return: The started ProfileRun.
+        """
+        stop_profiling()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._traced = True
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        _state.run = self
+        return self
+
+    def stop(self):
+        """
+        Deactivates the run in the current thread and stops `tracemalloc` if the run started it.
+
+        :return: The stopped ProfileRun.
+        """
+        if self.seconds is None:
+            self.seconds = time.perf_counter() - self._t0
+        if _state.run is self:
+            _state.run = None
+        if self._traced:
+            tracemalloc.stop()
+            self._traced = False
+        return self
+
+    def report(self):
+        """
+        Aggregates the records of the run by function or step.
+
+        :return: DataFrame indexed by name, with the number of calls, the total and maximum wall time in
+            seconds, the total rows in and out, and the largest peak memory delta in MiB, sorted by total time.
+        """
+        columns = ["calls", "total_s", "max_s", "rows_in", "rows_out", "peak_mib"]
+        if not self.records:
+            return pd.DataFrame(columns=columns).rename_axis("name")
+        records = pd.DataFrame(self.records).astype({"rows_in": float, "rows_out": float, "peak_bytes": float})
+        report = records.groupby("name").agg(
+            calls=("seconds", "size"),
+            total_s=("seconds", "sum"),
+            max_s=("seconds", "max"),
+            rows_in=("rows_in", lambda rows: rows.sum(min_count=1)),
+            rows_out=("rows_out", lambda rows: rows.sum(min_count=1)),
+            peak_mib=("peak_bytes", "max"),
+        )
+        report["peak_mib"] = report["peak_mib"] / 2**20
+        return report.sort_values("total_s", ascending=False)
+
+    def write_log(self, path: str):
+        """
+        Appends the records of the run to a JSON-lines file, one line per call, followed by one line with
+        the totals of the run.
+
+        :param path: Path of the log file.
+        """
+        with open(path, "a", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps({"run": self.id, "label": self.label, **record}) + "\n")
+            f.write(json.dumps({"run": self.id, "label": self.label, "name": "<run>", "started": self.started, "seconds": self.seconds, "calls": len(self.records)}) + "\n")
+
+    @property
+    def _stack(self):
+        # Each thread nests its own calls.
+        return self._stacks.frames
+
+    def _enter(self, name: str, rows_in):
+        frame = {"name": name, "depth": len(self._stack), "rows_in": rows_in, "t0": time.perf_counter()}
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            frame["start"], frame["peak"] = current, current
+        self._stack.append(frame)
+        return frame
+
+    def _exit(self, frame: dict, rows_out):
+        seconds = time.perf_counter() - frame["t0"]
+        self._stack.pop()
+        peak_bytes = None
+        if "start" in frame and tracemalloc.is_tracing():
+            peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            peak_bytes = peak - frame["start"]
+            # Nested frames reset the peak counter: hand their peak over to the enclosing frame.
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+        with self._lock:
+            self.records.append({
+                "name": frame["name"], "depth": frame["depth"], "seconds": seconds,
+                "rows_in": frame["rows_in"], "rows_out": rows_out, "peak_bytes": peak_bytes,
+            })
+
+def start_profiling(label: str = "", memory: bool = False):
+    """
+    Starts a profiling run in the current thread.
+
+    :param label: Name of the run.
+    :param memory: If True, also measures the peak memory delta of each call.
+    :return: The started ProfileRun; call its `stop` method, or use it as a context manager.
+    """
+    return ProfileRun(label, memory).start()
+
+def stop_profiling():
+    """
+    Stops the profiling run active in the current thread, if any.
+
+    :return: The stopped ProfileRun, or None.
+    """
+    run = _state.run
+    return run.stop() if run is not None else None
+
+def propagate_profiling(fn):
+    """
+    Wraps a function so that, when it runs in another thread (e.g. in a thread pool), its profiled calls are
+    recorded in the run active in the current thread when it was wrapped.
+
+    :param fn: Function to wrap.
+    :return: The wrapped function, or fn itself if no run is active.
+    """
+    run = _state.run
+    if run is None:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        previous = _state.run
+        _state.run = run
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _state.run = previous
+    return wrapper
+
+def profiled(fn):
+    """
+    Decorator recording the calls of a function in the active profiling run, if any.
+    Rows in are those of the first DataFrame argument, rows out those of a DataFrame or Series result.
+    """
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        run = _state.run
+        if run is None:
+            return fn(*args, **kwargs)
+        frame = run._enter(name, _rows(args, kwargs))
+        result = None
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        finally:
+            run._exit(frame, len(result) if isinstance(result, (pd.DataFrame, pd.Series)) else None)
+    return wrapper
+
+class profile_step:
+    """
+    Context manager recording a block of code in the active profiling run, if any, under the given name.
+    """
+    def __init__(self, name: str, rows_in: int | None = None):
+        """
+        :param name: Name of the step in the report.
+        :param rows_in: Optional number of rows the step processes.
+        """
+        self.name = name
+        self.rows_in = rows_in
+        self._run = None
+
+    def __enter__(self):
+        self._run = _state.run
+        if self._run is not None:
+            self._frame = self._run._enter(self.name, self.rows_in)
+        return self
+
+    def __exit__(self, *exc):
+        if self._run is not None:
+            self._run._exit(self._frame, None)
+
+def _rows(args: tuple, kwargs: dict):
+    for arg in (*args, *kwargs.values()):
+        if isinstance(arg, pd.DataFrame):
+            return len(arg)
+    return None
@@ -0,0 +1,36 @@
+import pandas as pd
+
+def reads(*columns: str):
+    """
+    Decorator declaring the columns of the order frame a function or class reads, in its `columns` attribute,
+    so callers can pass it a narrow projection of the frame (see `required_columns` and `project`).
+
+    :param columns: Names of the columns read.
+    """
+    def decorate(fn):
+        fn.columns = tuple(columns)
+        return fn
+    return decorate
+
+def required_columns(*fns):
+    """
+    Union of the columns declared with `reads` by several functions or classes, in the order they are declared.
+
+    :param fns: Functions or classes decorated with `reads`.
+    :return: List of column names.
+    """
+    return list(dict.fromkeys(col for fn in fns for col in fn.columns))
+
+def project(df: pd.DataFrame, columns: list[str]):
+    """
+    Narrow view of a DataFrame on some of its columns. Unlike `df[columns]`, the column arrays are not copied:
+    the projection shares them with df, so neither of them may be modified in place.
+
+    :param df: DataFrame to project.
+    :param columns: Names of the columns to keep.
+    :return: DataFrame with the same index and the given columns.
+    """
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise KeyError(f"{missing} not in the DataFrame columns")
+    return pd.DataFrame({col: df[col] for col in columns}, index=df.index, columns=columns, copy=False)
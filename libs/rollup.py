@@ -0,0 +1,85 @@
+from .utils import pd, LOCATION_COLUMNS
+from .profiling import profiled
+from .projection import reads
+
+# Dimensions of the order rollup: the day/week of the order plus the categorical columns the Dashboard filters or
+# groups on. The age and rating range filters are not dimensions: the cube only answers filter states whose
+# sliders cover every order (see `shared.SharedDataset.select`).
+ROLLUP_DIMENSIONS = [
+    "Day_Ordered", "Week_Ordered", "City", "Road_traffic_density", "Type_of_order", "Festival", "Delivery_service_ID",
+]
+# Restaurant location of the orders: each slice of the cube is split by restaurant, so the number of distinct
+# restaurants of any set of slices is read from the cube.
+ROLLUP_PRESENCE = list(LOCATION_COLUMNS["Restaurant_location"])
+# Key columns of the cube.
+ROLLUP_KEYS = ROLLUP_DIMENSIONS + ROLLUP_PRESENCE
+# Columns of the order frame the rollup is built from.
+ROLLUP_SOURCE_COLUMNS = ["Time_Ordered"] + ROLLUP_KEYS[2:]
+
+def week_of_year(day: pd.Series):
+    """
+    Vectorized equivalent of `strftime("%W")`: week number of the year with weeks starting on Monday,
+    days before the first Monday of the year being week 0.
+
+    :param day: Datetime Series.
+    :return: Series of int week numbers.
+    """
+    return ((day.dt.dayofyear + 6 - day.dt.dayofweek) // 7).astype(int)
+
+@profiled
+@reads(*ROLLUP_SOURCE_COLUMNS)
+def build_rollup(df: pd.DataFrame):
+    """
+    Pre-aggregates the orders into a cube with one row per combination of `ROLLUP_KEYS` present in the data
+    (the `ROLLUP_DIMENSIONS` and the restaurant location) and an additive "Orders" measure (number of orders).
+    Any slice of the cube matching the categorical and date filters sums to the same counts as filtering the
+    order frame itself, and holds the restaurants present in those orders.
+
+    :param df: DataFrame containing the cleaned dataset with "Time_Ordered" and the other dimension columns.
+    :return: DataFrame with the dimension columns and the "Orders" count.
+    """
+    day = df["Time_Ordered"].dt.normalize()
+    df = df.assign(Day_Ordered=day, Week_Ordered=week_of_year(day))
+    df = df[ROLLUP_KEYS].groupby(ROLLUP_KEYS, observed=True, dropna=False).size().reset_index(name="Orders")
+    return df
+
+@profiled
+def append_rollup(rollup: pd.DataFrame, df: pd.DataFrame):
+    """
+    Folds new orders into an existing rollup cube, so the cube of a growing dataset is updated with the
+    appended rows only (see `utils.append_orders`). The result is the cube `build_rollup` would build from
+    all the orders.
+
+    :param rollup: Rollup cube of the previous orders.
+    :param df: DataFrame containing the new cleaned orders.
+    :return: Updated rollup cube.
+    """
+    added = build_rollup(df)
+    for col in ROLLUP_DIMENSIONS:
+        if isinstance(added[col].dtype, pd.CategoricalDtype) and added[col].dtype != rollup[col].dtype:
+            categories = rollup[col].cat.categories.union(added[col].cat.categories)
+            rollup, added = rollup.astype({col: pd.CategoricalDtype(categories)}), added.astype({col: pd.CategoricalDtype(categories)})
+    df = pd.concat([rollup, added], ignore_index=True)
+    df = df.groupby(ROLLUP_KEYS, observed=True, dropna=False)["Orders"].sum().reset_index()
+    return df
+
+def as_rollup(df: pd.DataFrame):
+    """
+    Returns the DataFrame itself if it is already a rollup cube, or builds the cube from an order frame.
+
+    :param df: Rollup cube or DataFrame containing the cleaned dataset.
+    :return: Rollup cube.
+    """
+    return df if "Orders" in df.columns else build_rollup(df)
+
+def weekly_orders(df: pd.DataFrame):
+    """
+    Sums the orders of a rollup cube per week, including the weeks without orders between the first and last one.
+
+    :param df: Rollup cube (see `build_rollup`).
+    :return: DataFrame with "Week_Ordered" and "ID" (number of orders) columns.
+    """
+    df = df.groupby("Week_Ordered")["Orders"].sum().rename("ID").reset_index()
+    all_weeks = pd.DataFrame({"Week_Ordered": range(df["Week_Ordered"].min(), df["Week_Ordered"].max() + 1)})
+    df = pd.merge(all_weeks, df, on="Week_Ordered", how="left").fillna(0)
+    return df
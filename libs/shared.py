@@ -0,0 +1,84 @@
+from .utils import pd, np
+from .rollup import build_rollup, ROLLUP_SOURCE_COLUMNS
+from .filters import FilterIndex, RANGE_FILTERS
+from .profiling import profiled
+from .projection import project
+
+class SharedDataset:
+    """
+    Read-only clean dataset shared by every Streamlit session of the process, with its rollup cube and
+    the filter indexes of both, built once (see `memo.load_dashboard_data`).
+    A filter state is resolved into row positions (`select`): these index arrays are all that is kept per
+    filter state, and the filtered frames are taken from the shared ones (`frames`) only for the rerun
+    that uses them, restricted to the columns the rerun reads. When every row matches, the shared frames
+    themselves (or a projection of the clean frame sharing its arrays) are returned, without a copy.
+    The rollup cube has no age or rating dimension. It counts the orders with both values, the only ones a
+    range filter can match, and answers the filter states whose age and rating ranges cover all of them;
+    otherwise the filtered orders stand in for the cube (every function taking a cube also takes the order
+    frame, see `rollup.as_rollup`).
+    The shared frames must not be modified in place.
+    """
+    @profiled
+    def __init__(self, df: pd.DataFrame, version: str = ""):
+        """
+        :param df: Clean DataFrame.
+        :param version: Version of the dataset (see `utils.dataset_version`), to prefix the state keys of
+            the results computed on it (see `memo.MetricsCache`).
+        """
+        self.df = df
+        self.version = version
+        ranged = df[RANGE_FILTERS].notna().all(axis=1).to_numpy()
+        self.rollup = build_rollup(df if ranged.all() else df.loc[ranged, ROLLUP_SOURCE_COLUMNS])
+        self.index = FilterIndex(df)
+        self.rollup_index = FilterIndex(self.rollup, date_column="Day_Ordered")
+        self.ranges = {col: (df[col].min(), df[col].max()) for col in RANGE_FILTERS}
+
+    def __repr__(self):
+        return f"SharedDataset(rows={len(self.df)}, rollup_rows={len(self.rollup)})"
+
+    @profiled
+    def select(self, filters: dict):
+        """
+        Finds the rows of the clean frame and of the rollup cube matching a filter state.
+
+        :param filters: Dictionary with the filter state (see `utils.apply_filters`).
+        :return: Tuple (positions in the clean frame, positions in the rollup cube): sorted NumPy arrays of
+            int32 positions, or None when every row matches. The positions in the rollup cube are False when
+            the age or rating ranges leave out some orders, and the cube cannot answer the filter state.
+        """
+        rows = _positions(self.index.select(filters), len(self.df))
+        if rows is not None and not self.covers_ranges(filters):
+            return rows, False
+        return rows, _positions(self.rollup_index.select(filters), len(self.rollup))
+
+    def covers_ranges(self, filters: dict):
+        """
+        Tells if the age and rating ranges of a filter state match every order with an age and a rating.
+
+        :param filters: Dictionary with the filter state (see `utils.apply_filters`).
+        :return: True if the ranges cover the smallest and largest age and rating.
+        """
+        return all(filters[col][0] <= lowest and filters[col][1] >= highest for col, (lowest, highest) in self.ranges.items())
+
+    @profiled
+    def frames(self, selection: tuple, columns: list[str] | None = None):
+        """
+        Takes the filtered frames of a selection.
+
+        :param selection: Tuple returned by `select`.
+        :param columns: Optional list of the columns of the clean frame to take (see `projection.required_columns`).
+            By default every column is taken.
+        :return: Tuple (filtered clean DataFrame, filtered rollup cube). When the cube cannot answer the filter
+            state, the second item is the filtered clean DataFrame with the `rollup.ROLLUP_SOURCE_COLUMNS`.
+        """
+        rows, rollup_rows = selection
+        df = self.df if columns is None else project(self.df, columns)
+        if rollup_rows is False:
+            return df.take(rows), project(self.df, ROLLUP_SOURCE_COLUMNS).take(rows)
+        return (df if rows is None else df.take(rows),
+                self.rollup if rollup_rows is None else self.rollup.take(rollup_rows))
+
+def _positions(positions: np.ndarray, rows: int):
+    if len(positions) == rows:
+        return None
+    return positions.astype(np.int32) if rows < 2**31 else positions
@@ -0,0 +1,99 @@
+from .utils import pd, np, LOCATION_COLUMNS
+from .geo import haversine_np, EARTH_RADIUS_KM
+from .profiling import profiled
+from .projection import reads
+
+# Length of one degree of latitude (and of longitude at the equator), in kilometers.
+KM_PER_DEGREE = EARTH_RADIUS_KM * np.pi / 180
+
+@reads("ID", *LOCATION_COLUMNS["Restaurant_location"], *LOCATION_COLUMNS["Delivery_location"])
+class SpatialIndex:
+    """
+    Grid index over the valid points of a location of the order frame (latitude and longitude of at least
+    1 degree, the same rule as the maps), answering radius and k-nearest queries without scanning every point:
+    - the points are bucketed into square cells of `cell_km` kilometers of latitude and sorted by cell, row
+      by row, so the cells of a grid row overlapping a query are one contiguous slice found with a binary search;
+    - the candidates of those slices are then filtered by their exact haversine distance.
+    k-nearest queries search growing radiuses until k points are found. The grid does not wrap around the
+    antimeridian.
+    """
+    @profiled
+    def __init__(self, df: pd.DataFrame, location: str = "Delivery_location", unique: bool = False, cell_km: float = 10.0):
+        """
+        :param df: DataFrame containing the latitude and longitude columns of the location.
+        :param location: Either "Restaurant_location" or "Delivery_location".
+        :param unique: If True, indexes each distinct coordinate once, with its number of orders in an "Orders"
+            column (for restaurants). Otherwise indexes every order.
+        :param cell_km: Side of the grid cells, in kilometers.
+        """
+        lat, lon = LOCATION_COLUMNS[location]
+        self.location = location
+        self.cell_km = cell_km
+        valid = (df[lat] >= 1) & (df[lon] >= 1)
+        if unique:
+            self.points = df.loc[valid, ["ID", lat, lon]].groupby([lat, lon]).count().rename(columns={"ID": "Orders"}).reset_index()
+        else:
+            self.points = df.loc[valid, [lat, lon]]
+        lat, lon = self.points[lat].to_numpy(dtype=np.float64), self.points[lon].to_numpy(dtype=np.float64)
+        self._cell_deg = cell_km / KM_PER_DEGREE
+        rows, cols = np.floor(lat / self._cell_deg).astype(np.int64), np.floor(lon / self._cell_deg).astype(np.int64)
+        self._row0, self._col0 = (rows.min(), cols.min()) if len(rows) else (0, 0)
+        self._rows = rows.max() - self._row0 + 1 if len(rows) else 0
+        self._cols = cols.max() - self._col0 + 1 if len(cols) else 0
+        keys = (rows - self._row0) * self._cols + (cols - self._col0)
+        self._order = np.argsort(keys, kind="stable")
+        self._keys, self._lat, self._lon = keys[self._order], lat[self._order], lon[self._order]
+
+    def __repr__(self):
+        return f"SpatialIndex(location={self.location!r}, points={len(self.points)}, cell_km={self.cell_km})"
+
+    def within(self, lat: float, lon: float, radius_km: float):
+        """
+        Finds the points within a distance of a coordinate.
+
+        :param lat: Latitude of the query point, in degrees.
+        :param lon: Longitude of the query point, in degrees.
+        :param radius_km: Search radius, in kilometers.
+        :return: Tuple of NumPy arrays (positions, distances): positions of the points in `points`, sorted by
+            increasing distance, and their distances in kilometers.
+        """
+        dlat = radius_km / KM_PER_DEGREE
+        first_row = max(int(np.floor((lat - dlat) / self._cell_deg)) - self._row0, 0)
+        last_row = min(int(np.floor((lat + dlat) / self._cell_deg)) - self._row0, self._rows - 1)
+        cos_lat = np.cos(np.radians(min(abs(lat) + dlat, 90.0)))
+        if cos_lat * 180 <= dlat:
+            first_col, last_col = 0, self._cols - 1
+        else:
+            dlon = dlat / cos_lat
+            first_col = max(int(np.floor((lon - dlon) / self._cell_deg)) - self._col0, 0)
+            last_col = min(int(np.floor((lon + dlon) / self._cell_deg)) - self._col0, self._cols - 1)
+        if first_row > last_row or first_col > last_col:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        rows = np.arange(first_row, last_row + 1) * self._cols
+        starts = np.searchsorted(self._keys, rows + first_col, side="left")
+        ends = np.searchsorted(self._keys, rows + last_col, side="right")
+        lengths = ends - starts
+        candidates = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        distances = haversine_np(lat, lon, self._lat[candidates], self._lon[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        by_distance = np.argsort(distances, kind="stable")
+        return self._order[candidates[by_distance]], distances[by_distance]
+
+    def nearest(self, lat: float, lon: float, k: int = 1):
+        """
+        Finds the k points closest to a coordinate.
+
+        :param lat: Latitude of the query point, in degrees.
+        :param lon: Longitude of the query point, in degrees.
+        :param k: Number of points to return.
+        :return: Tuple of NumPy arrays (positions, distances) as returned by `within`, with at most k points.
+        """
+        k = min(k, len(self.points))
+        radius_km = self.cell_km
+        positions, distances = self.within(lat, lon, radius_km)
+        # Stop at half the Earth's circumference, beyond which every point is within the radius.
+        while len(positions) < k and radius_km < np.pi * EARTH_RADIUS_KM:
+            radius_km *= 2
+            positions, distances = self.within(lat, lon, radius_km)
+        return positions[:k], distances[:k]
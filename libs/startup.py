@@ -0,0 +1,27 @@
+import importlib
+import threading
+
+_lock = threading.Lock()
+_thread = None
+
+def prewarm():
+    """
+    Loads the clean dataset, builds its rollup cube and filter indexes (see `memo.load_dashboard_data`) and
+    imports the plotting module in a background thread, once per process. Called by the Home page when the
+    server starts, so the first Dashboard rerun finds everything in the dataset cache; a Dashboard rerun
+    started while the thread is still loading waits for it instead of loading the dataset again.
+    This module imports nothing heavy itself, so calling it does not delay the page that calls it.
+
+    :return: The background thread.
+    """
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_warm, name="prewarm", daemon=True)
+            _thread.start()
+    return _thread
+
+def _warm():
+    memo = importlib.import_module(".memo", __package__)
+    memo.load_dashboard_data()
+    importlib.import_module(".metrics", __package__)
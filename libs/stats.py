@@ -0,0 +1,49 @@
+import numpy as np
+
+class QuantileSketch:
+    """
+    Approximate quantiles of a stream of values in bounded memory: a bottom-k sample keeps the `size`
+    values with the smallest random keys seen so far, which is a uniform sample of the stream, and the
+    quantiles are read from it. While fewer than `size` values were seen, the sample holds all of them and
+    the quantiles are exact; beyond that, their rank error is of the order of 1/sqrt(size).
+    """
+    def __init__(self, size: int = 100_000, seed: int = 0):
+        """
+        :param size: Number of values kept.
+        :param seed: Seed of the random keys, so a sketch of the same stream is reproducible.
+        """
+        self.size = size
+        self.count = 0
+        self.values = np.empty(0)
+        self._keys = np.empty(0)
+        self._rng = np.random.default_rng(seed)
+
+    def __repr__(self):
+        return f"QuantileSketch(size={self.size}, count={self.count})"
+
+    def update(self, values: np.ndarray):
+        """
+        Adds values to the sketch, ignoring NaN.
+
+        :param values: Array of numeric values.
+        :return: The updated QuantileSketch.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        keys = np.concatenate([self._keys, self._rng.random(len(values))])
+        values = np.concatenate([self.values, values])
+        if len(values) > self.size:
+            keep = np.argpartition(keys, self.size)[:self.size]
+            keys, values = keys[keep], values[keep]
+        self._keys, self.values = keys, values
+        return self
+
+    def quantile(self, q):
+        """
+        :param q: Quantile or array of quantiles, between 0 and 1.
+        :return: Approximate quantile(s), interpolated linearly like `pd.Series.quantile`. NaN if the sketch is empty.
+        """
+        if len(self.values) == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        return np.quantile(self.values, q)
@@ -0,0 +1,233 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CACHE_METADATA_KEY = b"cds_pa"
+STATS_METADATA_KEY = b"cds_pa_stats"
+SOURCE_METADATA_KEY = b"cds_pa_source"
+
+def file_digest(path: str, block_size: int = 1 << 20):
+    """
+    Computes the SHA-256 digest of a file, reading it in blocks.
+
+    :param path: Path of the file to hash.
+    :param block_size: Number of bytes read at a time.
+    :return: Hexadecimal digest string.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def file_signature(path: str):
+    """
+    Cheap fingerprint of a file, which changes whenever the file is rewritten, read from its metadata
+    without opening it.
+
+    :param path: Path of the file.
+    :return: List [size in bytes, modification time in nanoseconds], or None if the file is missing.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def cache_key(raw_path: str, version: int):
+    """
+    Builds the key identifying a clean dataset: the hash of the raw CSV plus the cleaner version.
+    If the raw CSV is not available the key is None, meaning any existing cache is accepted.
+
+    :param raw_path: Path of the raw CSV file.
+    :param version: Version number of the cleaning code.
+    :return: Dictionary with "raw_sha256" and "cleaner_version", or None.
+    """
+    if not os.path.exists(raw_path):
+        return None
+    return {"raw_sha256": file_digest(raw_path), "cleaner_version": version}
+
+def read_cache_key(path: str):
+    """
+    Reads the key stored in the metadata of a Parquet cache file, without loading its data.
+
+    :param path: Path of the Parquet cache file.
+    :return: Dictionary with the stored key, or None if the file is missing or has no key.
+    """
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except (FileNotFoundError, OSError):
+        return None
+    if CACHE_METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[CACHE_METADATA_KEY])
+
+def read_cache_source(path: str):
+    """
+    Reads the signature of the raw CSV a Parquet cache file was built from (see `file_signature`), as
+    recorded when it was written, without loading its data.
+
+    :param path: Path of the Parquet cache file.
+    :return: List [size, modification time], or None if the file is missing or has no signature.
+    """
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except (FileNotFoundError, OSError):
+        return None
+    if SOURCE_METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[SOURCE_METADATA_KEY])
+
+def write_cache_source(path: str, source: list):
+    """
+    Records a new signature of the raw CSV in a Parquet cache file, e.g. after the raw CSV was touched
+    without changing its contents. The file is rewritten from its Arrow table, without converting it to pandas.
+
+    :param path: Path of the Parquet cache file.
+    :param source: Signature of the raw CSV (see `file_signature`).
+    :return: None
+    """
+    table = pq.read_table(path)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SOURCE_METADATA_KEY] = json.dumps(source).encode()
+    tmp_path = path + ".tmp"
+    pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+    os.replace(tmp_path, path)
+    return None
+
+def read_cache_stats(path: str):
+    """
+    Reads the running imputation statistics stored with the clean dataset, without loading its data.
+
+    :param path: Path of the Parquet cache file.
+    :return: List with the dictionaries saved by `imputation.RunningStats.to_dict` in the base file and in
+        each part appended with the same key, in the order they were written. The last one is current.
+    """
+    stored = read_cache_key(path)
+    if stored is None:
+        return []
+    history = []
+    for file in [path] + [part for part in cache_parts(path) if read_cache_key(part) == stored]:
+        metadata = pq.read_schema(file).metadata or {}
+        if STATS_METADATA_KEY in metadata:
+            history.append(json.loads(metadata[STATS_METADATA_KEY]))
+    return history
+
+def read_cache(path: str, key: dict | None, columns: list[str] | None = None):
+    """
+    Loads the clean dataset from a Parquet cache file if it was built for the given key, followed by the
+    parts appended to it with the same key (see `write_cache_part`).
+
+    :param path: Path of the Parquet cache file.
+    :param key: Expected key (see `cache_key`). If None, any existing cache is accepted.
+    :param columns: Optional list of the columns to read. By default every column is read.
+    :return: Cached DataFrame, or None if the cache is missing or stale.
+    """
+    stored = read_cache_key(path)
+    if stored is None or (key is not None and stored != key):
+        return None
+    frames = [pd.read_parquet(path, columns=columns)] + [pd.read_parquet(part, columns=columns) for part in cache_parts(path) if read_cache_key(part) == stored]
+    if len(frames) == 1:
+        return frames[0]
+    df = pd.concat(frames, ignore_index=True)
+    # Categorical columns whose categories grew with the appended parts are concatenated as objects:
+    # restore the categories of the last part, which include every earlier one.
+    for col, dtype in frames[-1].dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) and df[col].dtype != dtype:
+            df[col] = df[col].astype(dtype)
+    return df
+
+def cache_parts(path: str):
+    """
+    Lists the parts appended to a Parquet cache file, in the order they were written.
+
+    :param path: Path of the Parquet cache file.
+    :return: List of part file paths.
+    """
+    return sorted(glob.glob(os.path.join(_parts_dir(path), "part-*.parquet")))
+
+def write_cache(df: pd.DataFrame, path: str, key: dict | None, stats: dict | None = None, source: list | None = None):
+    """
+    Writes the clean dataset to a Parquet cache file, storing the key in the file metadata.
+    The file is written to a temporary path first and then moved, so readers never see a partial file.
+
+    :param df: Clean DataFrame to store.
+    :param path: Path of the Parquet cache file.
+    :param key: Key the dataset was built for (see `cache_key`).
+    :param stats: Optional running imputation statistics stored with the data (see `read_cache_stats`).
+    :param source: Optional signature of the raw CSV the key was computed from (see `read_cache_source`).
+    :return: None
+    """
+    write_cache_chunks([df], path, key, stats, source)
+    return None
+
+def write_cache_part(df: pd.DataFrame, path: str, stats: dict | None = None):
+    """
+    Appends clean rows to a Parquet cache file as a new part file, with the key of the cache, so they are
+    loaded with it by `read_cache` without rewriting the existing files.
+
+    :param df: Clean DataFrame to append.
+    :param path: Path of the Parquet cache file.
+    :param stats: Optional running imputation statistics after the append (see `read_cache_stats`).
+    :return: Path of the part file written.
+    """
+    parts = cache_parts(path)
+    number = int(os.path.basename(parts[-1])[5:-8]) + 1 if parts else 1
+    part_path = os.path.join(_parts_dir(path), f"part-{number:05d}.parquet")
+    os.makedirs(_parts_dir(path), exist_ok=True)
+    write_cache_chunks([df], part_path, read_cache_key(path), stats)
+    return part_path
+
+def drop_cache_parts(path: str):
+    """
+    Deletes the parts appended to a Parquet cache file, once the file is rebuilt.
+
+    :param path: Path of the Parquet cache file.
+    :return: None
+    """
+    shutil.rmtree(_parts_dir(path), ignore_errors=True)
+    return None
+
+def write_cache_chunks(chunks, path: str, key: dict | None, stats: dict | None = None, source: list | None = None):
+    """
+    Writes an iterable of clean DataFrames with the same schema to a Parquet cache file, one row group
+    per chunk, so only one chunk is held in memory at a time. The key, statistics and source signature
+    are stored as in `write_cache`.
+
+    :param chunks: Iterable of clean DataFrames.
+    :param path: Path of the Parquet cache file.
+    :param key: Key the dataset was built for (see `cache_key`).
+    :param stats: Optional running imputation statistics stored with the data.
+    :param source: Optional signature of the raw CSV the key was computed from.
+    :return: Number of rows written.
+    """
+    tmp_path = path + ".tmp"
+    writer = None
+    rows = 0
+    try:
+        for df in chunks:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                metadata = dict(table.schema.metadata or {})
+                metadata[CACHE_METADATA_KEY] = json.dumps(key or {}).encode()
+                if stats is not None:
+                    metadata[STATS_METADATA_KEY] = json.dumps(stats).encode()
+                if source is not None:
+                    metadata[SOURCE_METADATA_KEY] = json.dumps(source).encode()
+                writer = pq.ParquetWriter(tmp_path, table.schema.with_metadata(metadata))
+            writer.write_table(table.replace_schema_metadata(writer.schema.metadata))
+            rows += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is not None:
+        os.replace(tmp_path, path)
+    return rows
+
+def _parts_dir(path: str):
+    return os.path.splitext(path)[0] + ".parts"
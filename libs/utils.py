@@ -1,52 +1,141 @@
+import hashlib
+import json
+import os
 import pandas as pd
 import numpy as np
-from haversine import haversine
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor
+from .geo import haversine_np
+from .imputation import RunningStats
+from .stats import QuantileSketch
+from .profiling import profiled
+from .storage import file_signature, cache_key, read_cache, read_cache_key, read_cache_source, write_cache_source, read_cache_stats, write_cache, write_cache_chunks, write_cache_part, drop_cache_parts, cache_parts
+from .columnar import read_columns, write_columns
 
 pd.set_option("display.max_columns", None)
 pd.set_option("future.no_silent_downcasting", True)
 
-def clear_data(df):
+# Bump whenever clear_data changes its output, so cached clean datasets are rebuilt.
+CLEANER_VERSION = 3
+
+# Fixed category sets of the low-cardinality columns, sorted so grouped outputs keep their alphabetical order.
+# Values outside these sets are stored as "Unknown".
+CATEGORIES = {
+    "City": ["Metropolitan", "Semi-Urban", "Unknown", "Urban"],
+    "Road_traffic_density": ["High", "Jam", "Low", "Medium", "Unknown"],
+    "Weatherconditions": ["Cloudy", "Fog", "Sandstorms", "Stormy", "Sunny", "Unknown", "Windy"],
+    "Festival": ["No", "Unknown", "Yes"],
+    "Type_of_order": ["Buffet", "Drinks", "Meal", "Snack", "Unknown"],
+    "Type_of_vehicle": ["Unknown", "bicycle", "electric_scooter", "motorcycle", "scooter"],
+}
+
+# Raw CSV columns read as strings, so every chunk of a file gets the same dtypes whatever values it holds.
+RAW_DTYPES = {col: str for col in [
+    "ID", "Delivery_person_ID", "Delivery_person_Age", "Delivery_person_Ratings", "Order_Date", "Time_Orderd",
+    "Time_Order_picked", "Weatherconditions", "Road_traffic_density", "Type_of_order", "Type_of_vehicle",
+    "multiple_deliveries", "Festival", "City", "Time_taken(min)",
+]}
+
+LOCATION_COLUMNS = {
+    "Restaurant_location": ("Restaurant_latitude", "Restaurant_longitude"),
+    "Delivery_location": ("Delivery_location_latitude", "Delivery_location_longitude"),
+}
+
+@profiled
+def clear_data(df, workers: int | None = None, running: RunningStats | None = None):
     """
-    Cleans and preprocesses the input DataFrame by performing the following steps:
+    Cleans and preprocesses the input DataFrame by performing the following steps.
+    Steps 1 to 14 are row-local (`_clean_rows`), steps 15 to 23 use statistics over the whole dataset (`imputation.RunningStats`, `_finish_rows`):
     1. Strips leading and trailing whitespace from all string columns.
     2. Converts the "Delivery_person_Age", "Delivery_person_Ratings" and "multiple_deliveries" columns to numeric types, coercing errors to NaN and setting the data type to "Int64".
     3. Renames the "Time_Orderd" column to "Time_Ordered".
     4. Replaces occurrences of "Metropolitian" with "Metropolitan" in the "City" column.
-    5. Converts the "Order_Date" column to datetime format and then to string format.
-    6. Converts the "Time_Ordered", "Time_Order_picked", and "Time_taken(min)" columns to appropriate datetime or time formats.
+    5. Converts the "Order_Date" column to datetime format.
+    6. Combines "Order_Date" with "Time_Ordered" and "Time_Order_picked" into single datetime columns, adding one day to "Time_Order_picked" when the order is picked after midnight (see `_assemble_timestamps`).
     7. Extracts numeric values from the "Time_taken(min)" column and converts them to "Int64".
     8. Removes the prefix "conditions " from the "Weatherconditions" column.
     9. Replaces "NaN" with "Unknown" in specified columns ("Weatherconditions", "Road_traffic_density", "City", "Festival").
     10. Ensures that "Delivery_person_Ratings" values do not exceed 5.0.
     11. Drops rows with more than two NaN values.
     12. Convert negative values to positive in the columns ("Restaurant_latitude", "Restaurant_longitude", "Delivery_location_latitude", "Delivery_location_longitude").
-    13. Creates "Restaurant_location" and "Delivery_location" columns by zipping latitude and longitude values.
-    14. Combines "Order_Date" and "Time_Ordered" to create a single datetime column for "Time_Ordered".
-    15. Combines "Order_Date" and "Time_Order_picked" to create a single datetime column for "Time_Order_picked".
-    16. Calculates "Time_Order_delivered" by adding "Time_taken(min)" to "Time_Order_picked" and swap "Order_Date" with it.
-    17. Fills NaN values in "Delivery_person_Age" with the median age.
-    18. Calculates the mean "Delivery_person_Ratings" for each "Delivery_person_ID" and fill NaN values in "Delivery_person_Ratings" with the mean rating.
-    19. Fills NaN values in "Time_Ordered" with the median "Time_to_pick".
-    20. Calculates the "Distance(km)" between "Restaurant_location" and "Delivery_location" using the Haversine formula.
-    21. Calculates the "Velocity(km/h)" based on "Distance(km)" and "Time_taken(min)".
-    22. Calculates "Prepare_time(min)" based on "Time_Ordered" and "Time_Order_picked".
-    23. Renames the "Delivery_Person_ID" column to "Delivery_service_ID".
-    24. Drop "multiple_deliveries" column.
-    25. Reorders the columns to a specified order.
-    26. Saves the cleaned DataFrame to a pickle file.
+    13. Calculates the "Distance(km)" between restaurant and delivery coordinates with the vectorized Haversine formula. Coordinates are kept as float64 latitude/longitude columns (see `location_tuples` for a tuple view).
+    14. Calculates "Time_Order_delivered" by adding "Time_taken(min)" to "Time_Order_picked" and swap "Order_Date" with it.
+    15. Fills NaN values in "Delivery_person_Age" with the median age.
+    16. Calculates the mean "Delivery_person_Ratings" for each "Delivery_person_ID" and fill NaN values in "Delivery_person_Ratings" with the mean rating.
+    17. Fills NaN values in "Time_Ordered" with the median "Time_to_pick".
+    18. Calculates the "Velocity(km/h)" based on "Distance(km)" and "Time_taken(min)".
+    19. Calculates "Prepare_time(min)" based on "Time_Ordered" and "Time_Order_picked".
+    20. Renames the "Delivery_Person_ID" column to "Delivery_service_ID".
+    21. Drop "multiple_deliveries" column.
+    22. Reorders the columns to a specified order.
+    23. Converts the low-cardinality columns to categoricals with the fixed sets in `CATEGORIES`, and "Delivery_service_ID" to a categorical of its observed values.
+
+    When `workers` is greater than 1, the row-local steps run on that many row partitions in a process pool,
+    and the cleaned partitions are joined in their original order before the global steps, so the output is
+    identical to the serial path.
+
+    When `running` is given, the statistics of steps 15 to 17 are those of the running aggregates updated
+    with df, so a batch of new orders is cleaned as part of everything seen before (see `append_orders`).
 
     :param df: DataFrame to be cleaned and preprocessed.
+    :param workers: Number of worker processes for the row-local steps. None or 1 cleans in the current process.
+    :param running: Optional running statistics of the previously cleaned rows, updated in place with df.
     :return: Cleaned and preprocessed DataFrame.
     """
+    if workers and workers > 1 and len(df) > workers:
+        bounds = np.linspace(0, len(df), workers + 1).astype(int)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_clean_rows, [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]))
+        df = pd.concat(parts, ignore_index=True)
+    else:
+        df = _clean_rows(df)
+    if running is None:
+        running = RunningStats()
+    running.update(_stats_inputs(df))
+    return _finish_rows(df, running.values())
+
+@profiled
+def clear_data_streaming(raw_path: str, out_path: str, chunksize: int = 100_000, key: dict | None = None):
+    """
+    Cleans a raw CSV that may not fit in memory, writing the result to a Parquet file chunk by chunk.
+    The first pass reads the raw file in chunks, applies the row-local steps of `clear_data` and adds each
+    chunk to the running statistics (median age, mean rating per "Delivery_person_ID" and median pick-up
+    time). The second pass reads the file again, cleans each chunk with those statistics and appends it
+    to the output, so peak memory is bounded by the chunk size plus the statistics. The running statistics
+    are stored with the output for later appends, and the signature of the raw file with the key (see
+    `storage.read_cache_source`). The output is identical to `clear_data(pd.read_csv(raw_path, dtype=RAW_DTYPES))`.
+
+    :param raw_path: Path of the raw CSV file.
+    :param out_path: Path of the Parquet file to write.
+    :param chunksize: Number of raw rows read at a time.
+    :param key: Optional cache key stored in the output metadata (see `storage.cache_key`).
+    :return: Number of rows written.
+    """
+    source = file_signature(raw_path)
+    running = RunningStats()
+    for chunk in pd.read_csv(raw_path, dtype=RAW_DTYPES, chunksize=chunksize):
+        running.update(_stats_inputs(_clean_rows(chunk)))
+    stats = running.values()
+    chunks = (_finish_rows(_clean_rows(chunk), stats) for chunk in pd.read_csv(raw_path, dtype=RAW_DTYPES, chunksize=chunksize))
+    return write_cache_chunks(chunks, out_path, key, running.to_dict(), source)
+
+@profiled
+def _clean_rows(df: pd.DataFrame):
+    """
+    Row-local steps of `clear_data` (1 to 14): each row is cleaned independently of the others,
+    so these steps can run on any partition of the raw data.
+
+    :param df: Raw DataFrame, or a chunk of it.
+    :return: DataFrame with the row-local steps applied.
+    """
     df = df.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
     df["Delivery_person_Age"] = df["Delivery_person_Age"].apply(pd.to_numeric, errors="coerce").astype("Int64")
     df["Delivery_person_Ratings"] = df["Delivery_person_Ratings"].apply(pd.to_numeric, errors="coerce")
     df["multiple_deliveries"] = df["multiple_deliveries"].apply(pd.to_numeric, errors="coerce").astype("Int64")
     df.rename(columns={"Time_Orderd": "Time_Ordered"}, inplace=True)
     df["City"] = df["City"].str.replace("Metropolitian", "Metropolitan", regex=False)
-    df["Order_Date"] = pd.to_datetime(df["Order_Date"], format="%d-%m-%Y").astype("string")
-    df["Time_Ordered"] = pd.to_datetime(df["Time_Ordered"], format="%H:%M:%S").dt.time.astype("string")
-    df["Time_Order_picked"] = pd.to_datetime(df["Time_Order_picked"], format="%H:%M:%S").dt.time.astype("string")
+    df["Order_Date"] = pd.to_datetime(df["Order_Date"], format="%d-%m-%Y")
+    df["Time_Ordered"], df["Time_Order_picked"] = _assemble_timestamps(df["Order_Date"], df["Time_Ordered"], df["Time_Order_picked"])
     df["Time_taken(min)"] = df["Time_taken(min)"].str.extract(r'(\d+)').astype("Int64")
     df["Weatherconditions"] = df["Weatherconditions"].str.replace("conditions ", "", regex=False)
     cols = ["Weatherconditions", "Road_traffic_density", "City", "Festival"]
@@ -57,135 +146,411 @@ def clear_data(df):
     cols = ["Restaurant_latitude", "Restaurant_longitude", "Delivery_location_latitude", "Delivery_location_longitude"]
     for col in cols:
         df[col] = abs(df[col])
-    df["Restaurant_location"] = list(zip(df["Restaurant_latitude"], df["Restaurant_longitude"]))
-    df["Delivery_location"] = list(zip(df["Delivery_location_latitude"], df["Delivery_location_longitude"]))
-    df.drop(columns=["Restaurant_latitude", "Restaurant_longitude", "Delivery_location_latitude", "Delivery_location_longitude"], inplace=True)
-    df["Time_Ordered"] = pd.to_datetime(df["Order_Date"] + " " + df["Time_Ordered"], format="%Y-%m-%d %H:%M:%S")
-    df["Time_Order_picked"] = pd.to_datetime(df["Order_Date"] + " " + df["Time_Order_picked"], format="%Y-%m-%d %H:%M:%S")
-    df["Time_Order_picked"] = df.apply(lambda row: row["Time_Order_picked"] + pd.Timedelta(days=1) if row["Time_Ordered"] > row["Time_Order_picked"] else row["Time_Order_picked"], axis=1)
+    df["Distance(km)"] = haversine_np(df["Restaurant_latitude"], df["Restaurant_longitude"], df["Delivery_location_latitude"], df["Delivery_location_longitude"])
     df["Time_Order_delivered"] = df["Time_Order_picked"] + pd.to_timedelta(df["Time_taken(min)"], unit="m")
     df.drop(["Order_Date"], axis=1, inplace=True)
-    df["Delivery_person_Age"] = df["Delivery_person_Age"].fillna(df["Delivery_person_Age"].median())
-    df_aux = df[["Delivery_person_ID", "Delivery_person_Ratings"]].dropna()
-    df_aux = df_aux.groupby(["Delivery_person_ID"]).mean().reset_index()
-    df = df.merge(df_aux, on="Delivery_person_ID", how="left", suffixes=("", "_mean"))
-    df["Delivery_person_Ratings"] = df["Delivery_person_Ratings"].fillna(df["Delivery_person_Ratings_mean"])
-    df.drop(columns=["Delivery_person_Ratings_mean"], inplace=True)
-    df_aux = df[["Time_Ordered", "Time_Order_picked", "Time_Order_delivered", "Type_of_order"]].dropna()
-    df_aux["Time_to_pick"] = (df_aux["Time_Order_picked"] - df_aux["Time_Ordered"]).dt.total_seconds() / 60
-    df_aux["Time_to_delivery"] = (df_aux["Time_Order_delivered"] - df_aux["Time_Order_picked"]).dt.total_seconds() / 60
-    df_aux = df_aux.drop(columns=["Time_Ordered", "Time_Order_picked", "Time_Order_delivered"])
-    df_times_grouped = df_aux.groupby(["Type_of_order"]).agg(["mean", "median"]).reset_index()
-    df["Time_Ordered"] = df["Time_Ordered"].fillna(df["Time_Order_picked"] - pd.to_timedelta(df_times_grouped.loc[0, ("Time_to_pick", "median")], unit="m"))
-    df["Distance(km)"] = df.apply(lambda x: haversine(x["Restaurant_location"], x["Delivery_location"]), axis=1)
+    return df
+
+@profiled
+def _stats_inputs(df: pd.DataFrame):
+    """
+    Extracts the narrow columns the global statistics of `clear_data` are computed from.
+    "Time_to_pick" is NaN for rows missing any of the order, pick-up or delivery times.
+
+    :param df: DataFrame returned by `_clean_rows`.
+    :return: DataFrame with "Delivery_person_ID", "Delivery_person_Age", "Delivery_person_Ratings", "Type_of_order" and "Time_to_pick" columns.
+    """
+    df_aux = df[["Delivery_person_ID", "Delivery_person_Age", "Delivery_person_Ratings", "Type_of_order"]].copy()
+    complete = df[["Time_Ordered", "Time_Order_picked", "Time_Order_delivered", "Type_of_order"]].notna().all(axis=1)
+    df_aux["Time_to_pick"] = ((df["Time_Order_picked"] - df["Time_Ordered"]).dt.total_seconds() / 60).where(complete)
+    return df_aux
+
+@profiled
+def _finish_rows(df: pd.DataFrame, stats: dict):
+    """
+    Steps 15 to 23 of `clear_data`: fills missing values from the global statistics, derives the
+    remaining columns and sets the final column order and dtypes.
+
+    :param df: DataFrame returned by `_clean_rows`.
+    :param stats: Dictionary returned by `imputation.RunningStats.values`.
+    :return: Cleaned DataFrame.
+    """
+    df["Delivery_person_Age"] = df["Delivery_person_Age"].fillna(stats["age_median"])
+    df["Delivery_person_Ratings"] = df["Delivery_person_Ratings"].fillna(df["Delivery_person_ID"].map(stats["rating_means"]))
+    df["Time_Ordered"] = df["Time_Ordered"].fillna(df["Time_Order_picked"] - pd.to_timedelta(stats["pick_time_median"], unit="m"))
     df["Velocity(km/h)"] = df["Distance(km)"] / (df["Time_taken(min)"] / 60)
     df["Pick_time(min)"] = ((df["Time_Order_picked"] - df["Time_Ordered"]).dt.total_seconds() / 60).astype(int)
     df.rename(columns={"Delivery_person_ID": "Delivery_service_ID"}, inplace=True)
     df.drop(columns=["multiple_deliveries"], inplace=True)
-    df = df[["ID", "Delivery_service_ID", "Delivery_person_Age", "Delivery_person_Ratings", "Type_of_order", "Time_Ordered", "Time_Order_picked", "Pick_time(min)", "Time_Order_delivered", "Time_taken(min)", "Type_of_vehicle", "Vehicle_condition", "City", "Road_traffic_density", "Weatherconditions", "Festival", "Restaurant_location", "Delivery_location","Distance(km)", "Velocity(km/h)"]]
-    df.to_pickle("./data/dataset_clear.pkl")
+    df = df[["ID", "Delivery_service_ID", "Delivery_person_Age", "Delivery_person_Ratings", "Type_of_order", "Time_Ordered", "Time_Order_picked", "Pick_time(min)", "Time_Order_delivered", "Time_taken(min)", "Type_of_vehicle", "Vehicle_condition", "City", "Road_traffic_density", "Weatherconditions", "Festival", "Restaurant_latitude", "Restaurant_longitude", "Delivery_location_latitude", "Delivery_location_longitude", "Distance(km)", "Velocity(km/h)"]].copy()
+    for col, categories in CATEGORIES.items():
+        df[col] = df[col].astype(pd.CategoricalDtype(categories)).fillna("Unknown")
+    df["Delivery_service_ID"] = df["Delivery_service_ID"].astype(pd.CategoricalDtype(stats["service_ids"]))
     return df
 
-def load_dataset():
+def _assemble_timestamps(order_date: pd.Series, time_ordered: pd.Series, time_picked: pd.Series):
+    """
+    Builds the "Time_Ordered" and "Time_Order_picked" timestamps from the order date and the "HH:MM:SS" times.
+    Each time is parsed once into an integer nanosecond offset and added to the date, without going
+    through strings. Orders picked before the order time are assumed to be picked on the next day.
+    Missing times, and times that are not a time of day, are NaT and never trigger the rollover.
+
+    :param order_date: Datetime Series with the order dates.
+    :param time_ordered: Series with the order times as "HH:MM:SS" strings.
+    :param time_picked: Series with the pick-up times as "HH:MM:SS" strings.
+    :return: Tuple of datetime Series ("Time_Ordered", "Time_Order_picked").
+    """
+    nat = np.iinfo(np.int64).min
+    date_ns = order_date.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    ordered_ns = _time_of_day_ns(time_ordered)
+    picked_ns = _time_of_day_ns(time_picked)
+    ordered_ok = (ordered_ns != nat) & (date_ns != nat)
+    picked_ok = (picked_ns != nat) & (date_ns != nat)
+    rollover = ordered_ok & picked_ok & (ordered_ns > picked_ns)
+    ordered = np.where(ordered_ok, date_ns + ordered_ns, nat)
+    picked = np.where(picked_ok, date_ns + picked_ns + rollover * np.int64(86_400_000_000_000), nat)
+    return (pd.Series(ordered.view("datetime64[ns]"), index=order_date.index),
+            pd.Series(picked.view("datetime64[ns]"), index=order_date.index))
+
+def _time_of_day_ns(times: pd.Series):
+    """
+    :param times: Series with "HH:MM:SS" strings.
+    :return: NumPy int64 array with the nanoseconds since midnight, `np.iinfo(np.int64).min` (NaT) where
+        the time is missing, unparsable or outside [00:00:00, 24:00:00).
     """
-    Loads the dataset from a CSV file. If the cleaned dataset is not found,
-    it loads the raw dataset, cleans it using the `clear_data` function,
-    and saves the cleaned dataset to a pickle file.
+    nat = np.iinfo(np.int64).min
+    ns = pd.to_timedelta(times, errors="coerce").to_numpy(dtype="timedelta64[ns]").view(np.int64)
+    return np.where((ns >= 0) & (ns < 86_400_000_000_000), ns, nat)
+
+@profiled
+def load_dataset(raw_path: str = "./data/dataset_raw.csv", cache_path: str = "./data/dataset_clear.parquet", chunksize: int | None = None, workers: int | None = None,
+                 store_path: str | None = None, columns: list[str] | None = None):
+    """
+    Loads the cleaned dataset from its Parquet cache. The cache is keyed on the SHA-256 of the raw CSV
+    and on `CLEANER_VERSION`; if the cache is missing or either of them changed, it loads the raw dataset,
+    cleans it using the `clear_data` function, and rewrites the cache. The raw CSV is only hashed again
+    when its size or modification time differ from those recorded in the cache.
+    If the raw CSV is not available, any existing cache is used as is.
+    When `chunksize` is given, the cache is rebuilt with `clear_data_streaming` instead, for raw files larger than memory.
+    Otherwise `workers` is passed to `clear_data` to clean the raw rows in parallel.
+    Orders appended with `append_orders` are loaded with the cache, and dropped when it is rebuilt.
+    When `store_path` is given, the dataset is opened from a memory-mapped columnar store at that path (see
+    `columnar.read_columns`) instead, in milliseconds, and only the pages of the columns used are read. The
+    store mirrors the Parquet cache and its appended parts, and is rewritten from them when they change.
+    The returned DataFrame is then read-only and must not be modified in place.
+    `columns` restricts the loaded columns, from either storage.
     Returns:
         pd.DataFrame: The loaded and possibly cleaned dataset.
     """
-    try:
-        df = pd.read_pickle("./data/dataset_clear.pkl")
-    except FileNotFoundError:
-        df = pd.read_csv("./data/dataset_raw.csv")
-        df = clear_data(df)
+    source = file_signature(raw_path)
+    key = _raw_key(raw_path, cache_path, source)
+    if store_path is not None:
+        stored = read_cache_key(cache_path)
+        if stored is not None and (key is None or stored == key):
+            df = read_columns(store_path, _store_key(cache_path, stored), columns)
+            if df is not None:
+                return df
+    df = read_cache(cache_path, key, None if store_path else columns)
+    if df is None and chunksize:
+        drop_cache_parts(cache_path)
+        clear_data_streaming(raw_path, cache_path, chunksize, key)
+        df = read_cache(cache_path, key, None if store_path else columns)
+    elif df is None:
+        drop_cache_parts(cache_path)
+        running = RunningStats()
+        df = pd.read_csv(raw_path, dtype=RAW_DTYPES)
+        df = clear_data(df, workers, running)
+        write_cache(df, cache_path, key, running.to_dict(), source)
+    if store_path is not None:
+        write_columns(df, store_path, _store_key(cache_path, read_cache_key(cache_path)))
+        return read_columns(store_path, None, columns)
+    return df if columns is None or list(df.columns) == list(columns) else df[columns]
+
+def dataset_version(raw_path: str = "./data/dataset_raw.csv", cache_path: str = "./data/dataset_clear.parquet"):
+    """
+    Cheap fingerprint of the files `load_dataset` builds the clean dataset from, to notice a new dataset
+    without loading it: the size and modification time (see `storage.file_signature`) of the raw CSV, or of
+    the Parquet cache when there is no raw CSV, and of the parts appended with `append_orders` since, plus
+    `CLEANER_VERSION`. The Parquet cache and the columnar store derived from the raw CSV do not change it,
+    nor do the older parts a rebuild drops.
+
+    :param raw_path: Path of the raw CSV file.
+    :param cache_path: Path of the Parquet cache file.
+    :return: Hexadecimal digest string.
+    """
+    source = file_signature(raw_path if os.path.exists(raw_path) else cache_path)
+    parts = [[os.path.basename(part), file_signature(part)] for part in cache_parts(cache_path)]
+    signature = [CLEANER_VERSION, source, [part for part in parts if source is None or part[1][1] >= source[1]]]
+    return hashlib.sha256(json.dumps(signature).encode()).hexdigest()
+
+def _raw_key(raw_path: str, cache_path: str, source: list | None):
+    # Hashing the raw CSV reads all of it: the key stored in the cache is reused as long as the raw CSV has
+    # the size and modification time recorded when the key was computed.
+    stored = read_cache_key(cache_path)
+    if source is not None and stored is not None and stored.get("cleaner_version") == CLEANER_VERSION and read_cache_source(cache_path) == source:
+        return stored
+    key = cache_key(raw_path, CLEANER_VERSION)
+    if key is not None and key == stored:
+        # Same contents with a new modification time: record it, so the next load does not hash again.
+        write_cache_source(cache_path, source)
+    return key
+
+def _store_key(cache_path: str, stored: dict):
+    # The columnar store is valid for the key of the Parquet cache and the parts appended to it so far.
+    return {"cache": stored, "parts": [os.path.basename(part) for part in cache_parts(cache_path)]}
+
+@profiled
+def append_orders(df: pd.DataFrame, cache_path: str = "./data/dataset_clear.parquet"):
+    """
+    Ingests a batch of new raw orders without rebuilding the clean dataset. Only the batch is cleaned,
+    with the running imputation statistics stored in the cache updated with it, and the cleaned rows are
+    written as a new part of the cache (see `storage.write_cache_part`) together with the updated statistics.
+    Rows stored earlier keep the values imputed when they were cleaned: they differ from a full rebuild by
+    at most the drift reported by `imputation_drift`. `rollup.append_rollup` folds the returned rows into
+    an existing rollup cube.
+
+    :param df: Raw DataFrame with the columns of the raw CSV, read with `RAW_DTYPES`.
+    :param cache_path: Path of the Parquet cache file of the clean dataset.
+    :return: Cleaned DataFrame with the appended rows.
+    """
+    history = read_cache_stats(cache_path)
+    if not history:
+        raise ValueError(f"{cache_path} has no running statistics, rebuild it with load_dataset before appending orders")
+    running = RunningStats.from_dict(history[-1])
+    df = clear_data(df, running=running)
+    write_cache_part(df, cache_path, running.to_dict())
     return df
 
-def check_outliers(df, bounds=1.5):
+def imputation_drift(cache_path: str = "./data/dataset_clear.parquet"):
+    """
+    Bounds how far the values imputed in a clean dataset grown with `append_orders` are from those of a
+    full rebuild: for each statistic, the largest drift between the statistics each file was cleaned with
+    and the current ones (see `imputation.RunningStats.drift`).
+
+    :param cache_path: Path of the Parquet cache file of the clean dataset.
+    :return: Dictionary with the largest drift of "age_median", "rating_mean" and "pick_time_median",
+        or None if the cache has no running statistics.
+    """
+    snapshots = [RunningStats.from_dict(stats) for stats in read_cache_stats(cache_path)]
+    if not snapshots:
+        return None
+    drifts = [snapshots[-1].drift(snapshot) for snapshot in snapshots]
+    return {name: max(drift[name] for drift in drifts) for name in ["age_median", "rating_mean", "pick_time_median"]}
+
+@profiled
+def apply_filters(df: pd.DataFrame, filters: dict, date_column: str = "Time_Ordered", index=None):
+    """
+    Applies the Dashboard sidebar filters to the order frame or to a rollup cube. The age and rating filters
+    are skipped when df has no such column (a rollup cube, see `rollup.ROLLUP_DIMENSIONS`).
+
+    :param df: DataFrame to filter.
+    :param filters: Dictionary with the filter state: "date" (start and end dates), "Delivery_person_Age" and
+        "Delivery_person_Ratings" (min and max values), and "Road_traffic_density", "City", "Type_of_order" and
+        "Festival" (lists of selected values; an empty list selects everything).
+    :param date_column: Datetime column compared against the date range.
+    :param index: Optional `filters.FilterIndex` built over df. When given, the rows are selected from the
+        index and taken from df in one step.
+    :return: Filtered DataFrame.
+    """
+    if index is not None:
+        return df.take(index.select(filters))
+    date_init, date_end = filters["date"]
+    day = df[date_column].dt.normalize()
+    mask = (day >= pd.Timestamp(date_init)) & (day <= pd.Timestamp(date_end))
+    for col in ["Delivery_person_Age", "Delivery_person_Ratings"]:
+        if col not in df.columns:
+            continue
+        low, high = filters[col]
+        mask &= (df[col] >= low) & (df[col] <= high)
+    for col in ["Road_traffic_density", "City", "Type_of_order", "Festival"]:
+        if filters[col]:
+            mask &= df[col].isin(filters[col])
+    return df[mask.fillna(False).to_numpy(dtype=bool)]
+
+def location_tuples(df: pd.DataFrame, location: str):
+    """
+    Builds a (latitude, longitude) tuple view of a location stored as two float columns.
+    Kept for backward compatibility with code expecting the old "Restaurant_location" and
+    "Delivery_location" tuple columns.
+
+    :param df: DataFrame containing the latitude and longitude columns of the location.
+    :param location: Either "Restaurant_location" or "Delivery_location".
+    :return: Series of (latitude, longitude) tuples with the same index as df.
+    """
+    lat, lon = LOCATION_COLUMNS[location]
+    return pd.Series(list(zip(df[lat], df[lon])), index=df.index, name=location)
+
+def check_outliers(df, bounds=1.5, report=False):
     """
     Receives a DataFrame and return another Dataframe with only outliers.
     Take as base the assumption that the data is normally distributed.
-    
+    The quartiles of every numeric column are computed in one `quantile` call and compared against the
+    whole numeric block at once, giving a boolean outlier matrix with one column per numeric column.
+    Outlier rows are listed by the first column they are an outlier in, then in their original order.
+
     :param df: DataFrame to be analyzed.
     :param bounds: Multiplier for IQR to determine outliers, smaller number means greater sensitivity.
-    :return: DataFrame with outliers.
-    """
-    outliers_list = []
-    # Loop through each numeric column in the DataFrame
-    for column in df.select_dtypes(include=[np.number]).columns:
-        # Calculate the 1 quartil (Q1)
-        q1 = df[column].quantile(0.25)
-        # Calculate the 3 quartil (Q3)
-        q3 = df[column].quantile(0.75)
-        # Calculate the Interquartile Range (IQR)
-        iqr = q3 - q1
-        # Define the upper and lower bounds for outliers
-        lower_bound = q1 - bounds * iqr
-        upper_bound = q3 + bounds * iqr
-        # Identify the outliers and add them to the list
-        outliers = df[(df[column] < lower_bound) | (df[column] > upper_bound)]
-        outliers_list.append(outliers)
-    # Concatenate all outliers identified
-    df_outliers = pd.concat(outliers_list).drop_duplicates().reset_index(drop=True)
+    :param report: If True, also returns the outlier matrix.
+    :return: DataFrame with outliers, and if `report` is True, a boolean DataFrame with the index of df and
+        one column per numeric column, True where the value is an outlier.
+    """
+    numeric = df.select_dtypes(include=[np.number])
+    quartiles = numeric.quantile([0.25, 0.75])
+    q1, q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+    iqr = q3 - q1
+    flags = _outlier_flags(numeric, q1 - bounds * iqr, q3 + bounds * iqr)
+    df_outliers = _outlier_rows(df, flags)
+    if report:
+        return df_outliers, pd.DataFrame(flags, index=df.index, columns=numeric.columns)
+    return df_outliers
+
+def check_outliers_streaming(path: str, bounds=1.5, batch_size: int = 100_000, sample_size: int = 100_000, report=False):
+    """
+    `check_outliers` for a Parquet file that may not fit in memory. The first pass reads the file in
+    batches and feeds every numeric column to a `stats.QuantileSketch`, the second pass flags each batch
+    against the bounds derived from the approximate quartiles and keeps only the outlier rows. With at most
+    `sample_size` values per column the quartiles, and so the result, are the same as `check_outliers`.
+
+    :param path: Path of the Parquet file to be analyzed.
+    :param bounds: Multiplier for IQR to determine outliers, smaller number means greater sensitivity.
+    :param batch_size: Number of rows read at a time.
+    :param sample_size: Number of values kept by the quantile sketch of each column.
+    :param report: If True, also returns the outlier matrix of the outlier rows.
+    :return: DataFrame with outliers, and if `report` is True, a boolean DataFrame indexed by the position
+        of the outlier rows in the file, with one column per numeric column.
+    """
+    sketches = {}
+    for batch in pq.ParquetFile(path).iter_batches(batch_size):
+        numeric = batch.to_pandas().select_dtypes(include=[np.number])
+        for col in numeric.columns:
+            sketches.setdefault(col, QuantileSketch(sample_size)).update(numeric[col].to_numpy(dtype=np.float64, na_value=np.nan))
+    columns = list(sketches)
+    quartiles = pd.DataFrame({col: sketches[col].quantile([0.25, 0.75]) for col in columns}, index=[0.25, 0.75], columns=columns)
+    q1, q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+    iqr = q3 - q1
+    parts, part_flags, start = [], [], 0
+    for batch in pq.ParquetFile(path).iter_batches(batch_size):
+        df = batch.to_pandas()
+        flags = _outlier_flags(df[columns], q1 - bounds * iqr, q3 + bounds * iqr)
+        rows = np.flatnonzero(flags.any(axis=1))
+        parts.append(df.iloc[rows].set_axis(rows + start))
+        part_flags.append(flags[rows])
+        start += len(df)
+    df = pd.concat(parts) if parts else pd.DataFrame(columns=columns)
+    flags = np.concatenate(part_flags) if part_flags else np.zeros((0, len(columns)), dtype=bool)
+    df_outliers = _outlier_rows(df, flags)
+    if report:
+        return df_outliers, pd.DataFrame(flags, index=df.index, columns=columns)
     return df_outliers
 
-def stringfy_time(time: int | float | list[int | float] | pd.DataFrame):
+def _outlier_flags(numeric: pd.DataFrame, lower: pd.Series, upper: pd.Series):
+    """
+    :param numeric: DataFrame with the numeric columns.
+    :param lower: Lower bound of each column.
+    :param upper: Upper bound of each column.
+    :return: Boolean NumPy matrix, True where a value is outside its column bounds (never for missing values).
+    """
+    values = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+    return (values < lower.to_numpy(dtype=np.float64)) | (values > upper.to_numpy(dtype=np.float64))
+
+def _outlier_rows(df: pd.DataFrame, flags: np.ndarray):
+    """
+    Selects the rows with at least one outlier, ordered by the first column they are an outlier in and
+    then by position, without duplicate rows.
+
+    :param df: DataFrame the flags were computed on.
+    :param flags: Boolean outlier matrix (see `_outlier_flags`).
+    :return: DataFrame with the outlier rows and a fresh index.
+    """
+    rows = np.flatnonzero(flags.any(axis=1))
+    rows = rows[np.argsort(flags[rows].argmax(axis=1), kind="stable")]
+    return df.iloc[rows].drop_duplicates().reset_index(drop=True)
+
+def stringfy_time(time: int | float | list[int | float] | np.ndarray | pd.Series | pd.DataFrame):
     """
     Converts time values from minutes to a string format of "hours:minutes".
 
+    The values are rounded to whole minutes (half to even, like `round`) and split into hours and minutes
+    with array arithmetic; each distinct value is formatted once.
     This function handles different types of input:
     - If the input is a single integer or float, it converts it to a string in the format "hours:minutes".
-    - If the input is a list of integers or floats, it converts each element to the "hours:minutes" format.
+    - If the input is a list, a NumPy array or a Series of integers or floats, it converts each element to the "hours:minutes" format.
     - If the input is a DataFrame, it converts each numeric element to the "hours:minutes" format.
 
     Parameters:
-    time (int | float | list[int | float] | pd.DataFrame): The time value(s) to be converted.
+    time (int | float | list[int | float] | np.ndarray | pd.Series | pd.DataFrame): The time value(s) to be converted.
         - If int or float: A single time value in minutes.
-        - If list: A list of time values in minutes.
+        - If list, np.ndarray or pd.Series: Time values in minutes.
         - If pd.DataFrame: A DataFrame containing time values in minutes.
 
     Returns:
     str | list[str] | list[list[str]]: The formatted time string(s).
         - If input is int or float: A single string in the format "hours:minutes".
-        - If input is list: A list of strings in the format "hours:minutes".
+        - If input is list or pd.Series: A list of strings in the format "hours:minutes".
+        - If input is np.ndarray: Nested lists of strings with the shape of the array.
         - If input is pd.DataFrame: A list of lists of strings in the format "hours:minutes".
 
     Raises:
-    ValueError: If the input type is invalid or if elements in the list or DataFrame are not int or float.
+    ValueError: If the input type is invalid, if elements in the list, array, Series or DataFrame are not int or float,
+        or if a value is NaN. Infinite values raise OverflowError and values out of the `pd.Timedelta` range raise
+        `pd.errors.OutOfBoundsTimedelta`, as when converting them one by one.
     """
     if isinstance(time, (int, float, np.int64, np.float64)):
-        time = pd.Timedelta(round(time), unit="m")
-        total_seconds = int(time.total_seconds())
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        return f"{hours}:{minutes:02d}"
+        return _format_minutes(np.array([time], dtype=np.float64))[0]
     elif isinstance(time, list):
-        formatted_times = []
-        for t in time:
-            if isinstance(t, (int, float, np.int64, np.float64)):
-                t = pd.Timedelta(round(t), unit="m")
-                total_seconds = int(t.total_seconds())
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
-                formatted_times.append(f"{hours}:{minutes:02d}")
-            else:
-                raise ValueError("List elements must be int or float")
-        return formatted_times
+        if not all(isinstance(t, (int, float, np.int64, np.float64)) for t in time):
+            raise ValueError("List elements must be int or float")
+        return _format_minutes(np.array(time, dtype=np.float64)).tolist()
+    elif isinstance(time, np.ndarray):
+        if time.dtype.kind not in "biuf":
+            raise ValueError("Array elements must be int or float")
+        return _format_minutes(time.astype(np.float64).ravel()).reshape(time.shape).tolist()
+    elif isinstance(time, pd.Series):
+        return _format_minutes(_numeric_values(time, "Series")).tolist()
     elif isinstance(time, pd.DataFrame):
-        formatted_times = []
-        for row in time.itertuples(index=False):
-            row_times = []
-            for t in row:
-                if isinstance(t, (int, float, np.int64, np.float64)):
-                    t = pd.Timedelta(round(t), unit="m")
-                    total_seconds = int(t.total_seconds())
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    row_times.append(f"{hours}:{minutes:02d}")
-                else:
-                    raise ValueError("DataFrame elements must be int or float")
-            formatted_times.append(row_times)
-        return formatted_times
+        values = np.column_stack([_numeric_values(time[col], "DataFrame") for col in time.columns]) if time.shape[1] else np.empty(time.shape)
+        return _format_minutes(values.ravel()).reshape(time.shape).tolist()
     else:
-        raise ValueError(f"Invalid input type: {type(time)}. Input must be int, float, list of int/float, or pd.DataFrame")
+        raise ValueError(f"Invalid input type: {type(time)}. Input must be int, float, list of int/float, np.ndarray, pd.Series or pd.DataFrame")
+
+def _numeric_values(values: pd.Series, container: str):
+    """
+    Converts a column to float64 for `stringfy_time`, accepting the same elements as formatting its
+    values one by one: NumPy numeric columns, and columns whose elements are all int or float.
+
+    :param values: Series to convert.
+    :param container: Name of the input type, for the error message.
+    :return: NumPy float64 array.
+    """
+    if values.dtype.kind in "biuf" and not values.hasnans:
+        return values.to_numpy(dtype=np.float64)
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in "f":
+        return values.to_numpy()
+    if not all(isinstance(t, (int, float, np.int64, np.float64)) for t in values):
+        raise ValueError(f"{container} elements must be int or float")
+    return np.array(list(values), dtype=np.float64)
 
+def _format_minutes(minutes: np.ndarray):
+    """
+    Formats a float64 array of minutes as "hours:minutes" strings.
+
+    :param minutes: One-dimensional float64 array.
+    :return: NumPy object array of strings.
+    """
+    minutes = np.round(minutes)
+    not_finite = np.flatnonzero(~np.isfinite(minutes))
+    if len(not_finite):
+        round(minutes[not_finite[0]])  # raises the same ValueError (NaN) or OverflowError (infinity) as `round`
+    if len(minutes) == 0:
+        return np.array([], dtype=object)
+    low, high = minutes.min(), minutes.max()
+    for extreme in (low, high):
+        pd.Timedelta(int(extreme), unit="m")  # raises OutOfBoundsTimedelta like converting each value
+    if high - low < 2 * len(minutes) + 1024:
+        # Dense range: label every minute between the extremes and index the labels directly.
+        values, inverse = np.arange(int(low), int(high) + 1), (minutes - low).astype(np.intp)
+    else:
+        values, inverse = np.unique(minutes.astype(np.int64), return_inverse=True)
+    hours, rest = np.divmod(values, 60)
+    labels = np.array([f"{h}:{m:02d}" for h, m in zip(hours.tolist(), rest.tolist())], dtype=object)
+    return labels[inverse]
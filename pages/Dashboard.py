@@ -1,17 +1,21 @@
 import datetime as dt
+import os
 import streamlit as st
 from PIL import Image
-from streamlit_folium import folium_static
 from libs import (
-    pd, np, load_dataset, get_metrics_company, get_metrics_deliveries, get_metrics_restaurants, 
+    pd, np, start_profiling, stop_profiling, profile_step, load_dashboard_data, metrics_cache, filter_key, required_columns, PanelScheduler, SpatialIndex, get_metrics_company, get_metrics_deliveries, get_metrics_restaurants, 
     get_mean_ratings_by_service, get_means_ratings_by_traffic, get_mean_ratings_by_weather, 
     get_mean_pick_time_by_city, get_mean_pick_time_by_order, get_top_10_fastest_deliveries, 
-    get_mean_pick_time_by_traffic, plot_orders_per_week, plot_orders_per_day, plot_orders_by_traffic, 
-    plot_orders_by_traffic_and_city_type, plot_weekly_orders_per_service, plot_central_delivery_locations, 
-    plot_restaurant_locations, plot_orders_heatmap, plot_deliveries_by_age, plot_deliveries_by_vehicle_condition
+    get_mean_pick_time_by_traffic, get_orders_near_restaurants, get_restaurant_density, get_nearest_restaurants, plot_orders_per_week, plot_orders_per_day, plot_orders_by_traffic, 
+    plot_orders_by_traffic_and_city_type, plot_weekly_orders_per_service, plot_deliveries_by_age, plot_deliveries_by_vehicle_condition
     )
+### Profiling
+# Hidden debug panel: add ?debug=1 to the URL to time this rerun (and ?debug=1&memory=1 for the peak memory of each call).
+PROFILE_LOG = os.environ.get("CDS_PA_PROFILE_LOG", "./data/profile.jsonl")
+stop_profiling()
+profile_run = start_profiling("dashboard", memory=st.query_params.get("memory") == "1") if st.query_params.get("debug") == "1" else None
 ### Loading
-df_clear = load_dataset()
+dataset = load_dashboard_data()
 ### Layout Streamlit
 st.set_page_config(page_title="Curry Company - Dashboard", page_icon="📈", layout="wide")
 ## Sidebar
@@ -48,16 +52,16 @@ with col2:
     date_end = st.date_input("End date:", value=dt.datetime(2022, 4, 6), min_value=dt.datetime(2022, 2, 11), max_value=dt.datetime(2022, 4, 6), format="DD-MM-YYYY")
 age_min, age_max = st.sidebar.slider(
     "Delivery person age:",
-    min_value=df_clear["Delivery_person_Age"].min(),
-    max_value=df_clear["Delivery_person_Age"].max(),
-    value=(df_clear["Delivery_person_Age"].min(), df_clear["Delivery_person_Age"].max()),
+    min_value=dataset.df["Delivery_person_Age"].min(),
+    max_value=dataset.df["Delivery_person_Age"].max(),
+    value=(dataset.df["Delivery_person_Age"].min(), dataset.df["Delivery_person_Age"].max()),
     step=1
 )
 rate_min, rate_max = st.sidebar.slider(
     "Delivery person rating:",
-    min_value=df_clear["Delivery_person_Ratings"].min(),
-    max_value=df_clear["Delivery_person_Ratings"].max(),
-    value=(df_clear["Delivery_person_Ratings"].min(), df_clear["Delivery_person_Ratings"].max()),
+    min_value=dataset.df["Delivery_person_Ratings"].min(),
+    max_value=dataset.df["Delivery_person_Ratings"].max(),
+    value=(dataset.df["Delivery_person_Ratings"].min(), dataset.df["Delivery_person_Ratings"].max()),
     step=0.1
 )
 st.sidebar.markdown("""---""")
@@ -67,22 +71,62 @@ city_options = st.sidebar.multiselect("City types:", ["Metropolitan", "Urban", "
 order_options = st.sidebar.multiselect("Order type:", ["Buffet", "Drinks", "Meal", "Snack"], default=[])
 festival_options = st.sidebar.multiselect("During festivals:", ["Yes", "No", "Unknown"], default=[])
 # Filters
-df_clear = df_clear[(pd.to_datetime(df_clear["Time_Ordered"]).dt.date >= date_init) & (pd.to_datetime(df_clear["Time_Ordered"]).dt.date <= date_end)]
-df_clear = df_clear[(df_clear["Delivery_person_Age"] >= age_min) & (df_clear["Delivery_person_Age"] <= age_max)]
-df_clear = df_clear[(df_clear["Delivery_person_Ratings"] >= rate_min) & (df_clear["Delivery_person_Ratings"] <= rate_max)]
-if traffic_options: df_clear = df_clear[df_clear["Road_traffic_density"].isin(traffic_options)]
-if city_options: df_clear = df_clear[df_clear["City"].isin(city_options)]
-if order_options: df_clear = df_clear[df_clear["Type_of_order"].isin(order_options)]
-if festival_options: df_clear = df_clear[df_clear["Festival"].isin(festival_options)]
+filters = {
+    "date": (date_init, date_end),
+    "Delivery_person_Age": (age_min, age_max),
+    "Delivery_person_Ratings": (rate_min, rate_max),
+    "Road_traffic_density": sorted(traffic_options),
+    "City": sorted(city_options),
+    "Type_of_order": sorted(order_options),
+    "Festival": sorted(festival_options),
+}
+# Results are cached per dataset version too, so a reloaded dataset never reuses them.
+filters_key = f"{dataset.version}:{filter_key(filters)}"
+def cached(fn, *args, **kwargs):
+    return metrics_cache.call(fn, filters_key, *args, **kwargs)
+# Only the row positions of a filter state are cached; the filtered frames are taken for this rerun, with
+# only the columns declared by the functions of the section shown (see `libs.reads`).
+selection = cached(dataset.select, filters)
+def view_frames(*fns):
+    return dataset.frames(selection, required_columns(*fns))
 ## Main page
 # body
+# The panels of a section are computed concurrently and drawn into placeholders as they finish (see `libs.PanelScheduler`).
+PANEL_WORKERS = int(os.environ.get("CDS_PA_PANEL_WORKERS", min(4, os.cpu_count() or 1)))
+
+def show_map(placeholder):
+    def render(m):
+        from streamlit_folium import folium_static
+        with profile_step("folium_static"), placeholder.container():
+            folium_static(m, width=1024, height=600)
+    return render
+
+def show_chart(placeholder):
+    return lambda fig: placeholder.plotly_chart(fig, use_container_width=True)
+
+def show_table(placeholder, **kwargs):
+    return lambda df: placeholder.dataframe(df, **kwargs)
+
+# Unlike st.tabs, which runs every tab on each rerun, only the selected section of the Company view is computed.
+COMPANY_SECTIONS = ["Tactical", "Managerial", "Geographical"]
+
 def viz1():
     st.title("Company View")
-    tab1, tab2, tab3 = st.tabs(["Tactical", "Managerial", "Geographical"], )
-    with tab1:
+    section = st.radio("Section:", COMPANY_SECTIONS, horizontal=True, label_visibility="collapsed", key="company_section")
+    if section == "Tactical":
+        viz1_tactical()
+    elif section == "Managerial":
+        viz1_managerial()
+    elif section == "Geographical":
+        viz1_geographical()
+    return None
+
+def viz1_tactical():
+    df_clear, df_rollup = view_frames(get_metrics_company)
+    with PanelScheduler(PANEL_WORKERS) as panels:
         with st.container(border=True):
             col1, col2, col3, col4, col5 = st.columns([1, 1, 1, 1, 1], gap="small")
-            comp_metrics = get_metrics_company(df_clear)
+        def show_metrics(comp_metrics):
             with col1:
                 st.metric("Total orders:", int(comp_metrics["total_deliveries"]), width="content")
                 st.metric("Weekly mean:", int(comp_metrics["week_mean_deliveries"]), width="content")
@@ -98,103 +142,136 @@ def viz1():
             with col5:
                 st.metric("Mean orders per delivery service:", int(comp_metrics["mean_deliveries_per_service"]))
                 st.metric("Worst week:", int(comp_metrics["week_min_deliveries"]), f"{-100 if np.isinf(((comp_metrics["week_min_deliveries"] - comp_metrics["week_mean_deliveries"]) / comp_metrics["week_mean_deliveries"]) * 100) else ((comp_metrics["week_min_deliveries"] - comp_metrics["week_mean_deliveries"]) / comp_metrics["week_mean_deliveries"]) * 100:.2f}%")
+        panels.submit(show_metrics, cached, get_metrics_company, df_clear, df_rollup)
         with st.container():
             col1, col2 = st.columns([1, 1], gap="medium")
-            with col1:
-                st.plotly_chart(plot_orders_per_week(df_clear), use_container_width=True)
-            with col2:
-                st.plotly_chart(plot_weekly_orders_per_service(df_clear), use_container_width=True)
-    with tab2:
-        with st.container():
-            st.plotly_chart(plot_orders_per_day(df_clear), use_container_width=True)
-            col1, col2 = st.columns([1, 1], gap="medium")
-            with col1:
-                st.plotly_chart(plot_orders_by_traffic(df_clear), use_container_width=True)
-            with col2:
-                st.plotly_chart(plot_orders_by_traffic_and_city_type(df_clear), use_container_width=True)
-    with tab3:
+            panels.submit(show_chart(col1.empty()), cached, plot_orders_per_week, df_rollup)
+            panels.submit(show_chart(col2.empty()), cached, plot_weekly_orders_per_service, df_rollup)
+    return None
+
+def viz1_managerial():
+    df_clear, df_rollup = view_frames(plot_orders_by_traffic, plot_orders_by_traffic_and_city_type)
+    with PanelScheduler(PANEL_WORKERS) as panels, st.container():
+        panels.submit(show_chart(st.empty()), cached, plot_orders_per_day, df_rollup)
+        col1, col2 = st.columns([1, 1], gap="medium")
+        panels.submit(show_chart(col1.empty()), cached, plot_orders_by_traffic, df_clear)
+        panels.submit(show_chart(col2.empty()), cached, plot_orders_by_traffic_and_city_type, df_clear)
+    return None
+
+def viz1_geographical():
+    # Imported here so folium is only loaded once the Geographical section is opened.
+    from libs import plot_central_delivery_locations, plot_restaurant_locations, plot_orders_heatmap, RESTAURANT_GRID_ZOOM, HEATMAP_GRID_ZOOM
+    df_clear, _ = view_frames(plot_central_delivery_locations, plot_restaurant_locations, plot_orders_heatmap, SpatialIndex,
+                              get_orders_near_restaurants, get_restaurant_density, get_nearest_restaurants)
+    # The metrics cache computes each spatial index once, even when several panels ask for it at the same time.
+    delivery_index = lambda: cached(SpatialIndex, df_clear, "Delivery_location")
+    restaurant_index = lambda: cached(SpatialIndex, df_clear, "Restaurant_location", unique=True)
+    with PanelScheduler(PANEL_WORKERS) as panels:
         with st.container():
             col1, col2, col3 = st.columns([1, 1, 1])
             with col1:
                 st.write("Central delivery locations:")
-                folium_static(plot_central_delivery_locations(df_clear), width=1024, height=600)
+                panels.submit(show_map(st.empty()), cached, plot_central_delivery_locations, df_clear)
             with col2:
                 st.write("Restaurant locations:")
-                folium_static(plot_restaurant_locations(df_clear), width=1024, height=600)
+                panels.submit(show_map(st.empty()), cached, plot_restaurant_locations, df_clear, zoom=RESTAURANT_GRID_ZOOM)
             with col3:
                 st.write("Orders HeatMap:")
-                folium_static(plot_orders_heatmap(df_clear), width=1024, height=600)
+                panels.submit(show_map(st.empty()), cached, plot_orders_heatmap, df_clear, zoom=HEATMAP_GRID_ZOOM)
+        with st.container():
+            radius_km = st.slider("Radius around restaurants (km):", min_value=1, max_value=50, value=5, step=1)
+            col1, col2, col3 = st.columns([1, 1, 1])
+            with col1:
+                st.write("Restaurants with the most orders delivered nearby:")
+                panels.submit(show_table(st.empty(), use_container_width=True), lambda: cached(get_orders_near_restaurants, df_clear, radius_km, index=delivery_index()))
+            with col2:
+                st.write("Densest restaurant areas:")
+                panels.submit(show_table(st.empty(), use_container_width=True), lambda: cached(get_restaurant_density, df_clear, radius_km, index=restaurant_index()))
+            with col3:
+                col_lat, col_lon = st.columns(2)
+                with col_lat:
+                    point_lat = st.number_input("Latitude:", value=20.904992, format="%.6f")
+                with col_lon:
+                    point_lon = st.number_input("Longitude:", value=79.417227, format="%.6f")
+                st.write("Nearest restaurants:")
+                panels.submit(show_table(st.empty(), use_container_width=True), lambda: cached(get_nearest_restaurants, df_clear, point_lat, point_lon, index=restaurant_index()))
     return None
                 
 def viz2():
     st.title("Delivery View")
-    with st.container(border=True):
-        col1, col2, col3, col4, col5 = st.columns([1, 1, 1, 1, 1])
-        del_metrics = get_metrics_deliveries(df_clear)
-        with col1:
-            st.metric("Lowest rating:", round(del_metrics["ratings_min"], 2))
-            st.metric("Mean delivery distance:", f"{del_metrics["delivery_distance_mean"]:.1f} km")
-        with col2:
-            st.metric("Highest rating:", round(del_metrics["ratings_max"], 2))
-            st.metric("Mean delivery time:", del_metrics["delivery_time_mean"])
-        with col3:
-            st.metric("Mean rating:", round(del_metrics["ratings_mean"], 2))
-            st.metric("Max delivery time:", del_metrics["delivery_time_max"])
-        with col4:
-            st.metric("Median rating:", round(del_metrics["ratings_median"], 2))
-            st.metric("Min delivery time:", del_metrics["delivery_time_min"])
-        with col5:
-            st.metric("Ratings variability:", round(del_metrics["ratings_std_dev"], 2))
-            st.metric("Delivery time variability:", del_metrics["delivery_time_std_dev"])
-    with st.container():
-        col1, col2 = st.columns([1, 1])
-        with col1:
-            st.plotly_chart(plot_deliveries_by_age(df_clear), use_container_width=True)
-        with col2:
-            st.plotly_chart(plot_deliveries_by_vehicle_condition(df_clear), use_container_width=True)
-    with st.container():
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            st.write("Mean ratings by delivery service:")
-            st.dataframe(get_mean_ratings_by_service(df_clear), use_container_width=True, height=623)
-        with col2:
-            st.write("Mean ratings and variation by traffic:")
-            st.dataframe(get_means_ratings_by_traffic(df_clear), use_container_width=True)
-            st.write("Mean ratings and variation by weather:")
-            st.dataframe(get_mean_ratings_by_weather(df_clear), use_container_width=True)
+    df_clear, _ = view_frames(get_metrics_deliveries, plot_deliveries_by_age, plot_deliveries_by_vehicle_condition,
+                              get_mean_ratings_by_service, get_means_ratings_by_traffic, get_mean_ratings_by_weather)
+    with PanelScheduler(PANEL_WORKERS) as panels:
+        with st.container(border=True):
+            col1, col2, col3, col4, col5 = st.columns([1, 1, 1, 1, 1])
+        def show_metrics(del_metrics):
+            with col1:
+                st.metric("Lowest rating:", round(del_metrics["ratings_min"], 2))
+                st.metric("Mean delivery distance:", f"{del_metrics["delivery_distance_mean"]:.1f} km")
+            with col2:
+                st.metric("Highest rating:", round(del_metrics["ratings_max"], 2))
+                st.metric("Mean delivery time:", del_metrics["delivery_time_mean"])
+            with col3:
+                st.metric("Mean rating:", round(del_metrics["ratings_mean"], 2))
+                st.metric("Max delivery time:", del_metrics["delivery_time_max"])
+            with col4:
+                st.metric("Median rating:", round(del_metrics["ratings_median"], 2))
+                st.metric("Min delivery time:", del_metrics["delivery_time_min"])
+            with col5:
+                st.metric("Ratings variability:", round(del_metrics["ratings_std_dev"], 2))
+                st.metric("Delivery time variability:", del_metrics["delivery_time_std_dev"])
+        panels.submit(show_metrics, cached, get_metrics_deliveries, df_clear)
+        with st.container():
+            col1, col2 = st.columns([1, 1])
+            panels.submit(show_chart(col1.empty()), cached, plot_deliveries_by_age, df_clear)
+            panels.submit(show_chart(col2.empty()), cached, plot_deliveries_by_vehicle_condition, df_clear)
+        with st.container():
+            col1, col2 = st.columns([1, 2])
+            with col1:
+                st.write("Mean ratings by delivery service:")
+                panels.submit(show_table(st.empty(), use_container_width=True, height=623), cached, get_mean_ratings_by_service, df_clear)
+            with col2:
+                st.write("Mean ratings and variation by traffic:")
+                panels.submit(show_table(st.empty(), use_container_width=True), cached, get_means_ratings_by_traffic, df_clear)
+                st.write("Mean ratings and variation by weather:")
+                panels.submit(show_table(st.empty(), use_container_width=True), cached, get_mean_ratings_by_weather, df_clear)
     return None
 
 def viz3():
     st.title("Restaurant View")
-    with st.container(border=True):
-        res_metrics = get_metrics_restaurants(df_clear)
-        col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
-        with col1:
-            st.metric("Mean order Pick-up time:", res_metrics["Pick_time_mean"])
-        with col2:
-            st.metric("Slowest order Pick-up time:", res_metrics["Pick_time_max"])
-        with col3:
-            st.metric("Fastest order Pick-up time:", res_metrics["Pick_time_min"])
-        with col4:
-            st.metric("Variation of order Pick-up time:", res_metrics["Pick_time_std_dev"])
-    with st.container():
-        col1, col2, col3 = st.columns([1, 1, 1])
-        with col1:
-            st.write("Mean Pick-up time by order:")
-            st.dataframe(get_mean_pick_time_by_order(df_clear))
-        with col2:
-            st.write("Mean Pick-up time by city type:")
-            st.dataframe(get_mean_pick_time_by_city(df_clear))
-        with col3:
-            st.write("Mean Pick-up time by traffic density:")
-            st.dataframe(get_mean_pick_time_by_traffic(df_clear), height=197)
-        col1, col2 = st.columns([1, 1])
-        with col1:
-            st.write("Top 10 fastest deliveries:")
-            st.dataframe(get_top_10_fastest_deliveries(df_clear))
-        with col2:
-            st.write("Top 10 fastest deliveries:")
-            st.dataframe(get_top_10_fastest_deliveries(df_clear, reverse=True))
+    df_clear, _ = view_frames(get_metrics_restaurants, get_mean_pick_time_by_order, get_mean_pick_time_by_city,
+                              get_mean_pick_time_by_traffic, get_top_10_fastest_deliveries)
+    with PanelScheduler(PANEL_WORKERS) as panels:
+        with st.container(border=True):
+            col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
+        def show_metrics(res_metrics):
+            with col1:
+                st.metric("Mean order Pick-up time:", res_metrics["Pick_time_mean"])
+            with col2:
+                st.metric("Slowest order Pick-up time:", res_metrics["Pick_time_max"])
+            with col3:
+                st.metric("Fastest order Pick-up time:", res_metrics["Pick_time_min"])
+            with col4:
+                st.metric("Variation of order Pick-up time:", res_metrics["Pick_time_std_dev"])
+        panels.submit(show_metrics, cached, get_metrics_restaurants, df_clear)
+        with st.container():
+            col1, col2, col3 = st.columns([1, 1, 1])
+            with col1:
+                st.write("Mean Pick-up time by order:")
+                panels.submit(show_table(st.empty()), cached, get_mean_pick_time_by_order, df_clear)
+            with col2:
+                st.write("Mean Pick-up time by city type:")
+                panels.submit(show_table(st.empty()), cached, get_mean_pick_time_by_city, df_clear)
+            with col3:
+                st.write("Mean Pick-up time by traffic density:")
+                panels.submit(show_table(st.empty(), height=197), cached, get_mean_pick_time_by_traffic, df_clear)
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                st.write("Top 10 fastest deliveries:")
+                panels.submit(show_table(st.empty()), cached, get_top_10_fastest_deliveries, df_clear)
+            with col2:
+                st.write("Top 10 fastest deliveries:")
+                panels.submit(show_table(st.empty()), cached, get_top_10_fastest_deliveries, df_clear, reverse=True)
     return None
 
 if 'visualizacao' not in st.session_state:
@@ -207,3 +284,9 @@ elif st.session_state.visualizacao == 3:
     viz3()
 st.markdown("""---""")
 st.write("*Powered by lucas7x*")
+if profile_run is not None:
+    profile_run.stop()
+    profile_run.write_log(PROFILE_LOG)
+    with st.expander("Profiling", expanded=True):
+        st.write(f"Rerun: {profile_run.seconds:.3f} s, {len(profile_run.records)} profiled calls, logged to {PROFILE_LOG}")
+        st.dataframe(profile_run.report(), use_container_width=True)
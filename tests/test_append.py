@@ -0,0 +1,30 @@
+import pandas as pd
+from benchmarks.generate import generate_raw
+from libs import load_dataset, append_orders, imputation_drift, clear_data, RAW_DTYPES
+
+# Columns filled from the running statistics, which may drift as orders are appended.
+IMPUTED = ["Delivery_person_Ratings", "Delivery_person_Age", "Time_Ordered", "Pick_time(min)"]
+
+def test_append_drift_is_bounded(tmp_path):
+    all_path, raw_path, cache_path = tmp_path / "all.csv", tmp_path / "raw.csv", str(tmp_path / "clean.parquet")
+    generate_raw(3_000, seed=5).to_csv(all_path, index=False)
+    raw = pd.read_csv(all_path, dtype=RAW_DTYPES)
+    # The first orders are copied line by line, so every value is parsed from the same text in both datasets.
+    raw_path.write_text("".join(all_path.read_text().splitlines(keepends=True)[:2_001]))
+    load_dataset(str(raw_path), cache_path)
+    for start in (2_000, 2_500):
+        append_orders(raw.iloc[start:start + 500].reset_index(drop=True), cache_path)
+    grown = load_dataset(str(raw_path), cache_path)
+    rebuilt = clear_data(raw)
+    drift = imputation_drift(cache_path)
+
+    assert grown["ID"].tolist() == rebuilt["ID"].tolist()
+    for col in rebuilt.columns.drop(IMPUTED):
+        pd.testing.assert_series_equal(grown[col], rebuilt[col], check_exact=True)
+    ratings = grown["Delivery_person_Ratings"]
+    assert rebuilt["Delivery_person_Ratings"][ratings.notna()].notna().all()
+    assert (ratings - rebuilt["Delivery_person_Ratings"]).abs().max() <= drift["rating_mean"]
+    assert (grown["Delivery_person_Age"] - rebuilt["Delivery_person_Age"]).abs().max() <= drift["age_median"]
+    minutes = (grown["Time_Ordered"] - rebuilt["Time_Ordered"]).abs().dt.total_seconds() / 60
+    assert minutes.max() <= drift["pick_time_median"]
+    assert (grown["Pick_time(min)"] - rebuilt["Pick_time(min)"]).abs().max() <= drift["pick_time_median"] + 1
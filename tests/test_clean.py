@@ -0,0 +1,10 @@
+import pandas as pd
+from benchmarks.generate import write_raw_csv
+from libs import clear_data, RAW_DTYPES
+
+def test_workers_match_serial(tmp_path):
+    write_raw_csv(tmp_path / "raw.csv", 3_001, seed=3)
+    raw = pd.read_csv(tmp_path / "raw.csv", dtype=RAW_DTYPES)
+    serial = clear_data(raw.copy())
+    for workers in (2, 3):
+        pd.testing.assert_frame_equal(clear_data(raw.copy(), workers=workers), serial)
@@ -0,0 +1,63 @@
+import datetime as dt
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.generate import write_raw_csv
+from libs import clear_data, apply_filters, build_rollup, FilterIndex, RAW_DTYPES
+
+FULL = {
+    "date": (dt.date(2022, 2, 11), dt.date(2022, 4, 6)),
+    "Delivery_person_Age": (15, 50),
+    "Delivery_person_Ratings": (1.0, 6.0),
+    "Road_traffic_density": [],
+    "City": [],
+    "Type_of_order": [],
+    "Festival": [],
+}
+
+@pytest.fixture(scope="module")
+def clean(tmp_path_factory):
+    path = tmp_path_factory.mktemp("filters") / "raw.csv"
+    write_raw_csv(path, 3_000, seed=8)
+    df = clear_data(pd.read_csv(path, dtype=RAW_DTYPES))
+    # Missing ages and ratings, which no range matches.
+    df.loc[df.index[::97], "Delivery_person_Age"] = pd.NA
+    df.loc[df.index[::89], "Delivery_person_Ratings"] = np.nan
+    return df
+
+def filter_states(df):
+    age, rating = df["Delivery_person_Age"].dropna(), df["Delivery_person_Ratings"].dropna()
+    day = df["Time_Ordered"].dt.date
+    first, middle = day.min(), day.sort_values().iloc[len(day) // 2]
+    return [
+        {},
+        {"Road_traffic_density": ["Unknown"], "City": ["Unknown", "Urban"]},
+        {"Festival": ["Unknown"], "Type_of_order": ["Snack", "Meal"]},
+        # Values without any row, alone and with others.
+        {"City": ["Nowhere"]},
+        {"Road_traffic_density": ["Nowhere", "Jam"]},
+        # Single days, at the first order and in the middle of the data.
+        {"date": (first, first)},
+        {"date": (middle, middle), "City": ["Metropolitan"]},
+        {"date": (middle, first)},
+        # Ranges starting and ending exactly at values of the data.
+        {"Delivery_person_Age": (int(age.min()), int(age.min()))},
+        {"Delivery_person_Age": (int(age.median()), int(age.max())), "Delivery_person_Ratings": (rating.median(), rating.median())},
+        {"Delivery_person_Ratings": (rating.min(), rating.max())},
+        {"Delivery_person_Ratings": (5.0, 5.0), "Festival": ["No"]},
+    ]
+
+def test_index_matches_apply_filters(clean):
+    index = FilterIndex(clean)
+    for overrides in filter_states(clean):
+        filters = {**FULL, **overrides}
+        pd.testing.assert_frame_equal(clean.take(index.select(filters)), apply_filters(clean, filters), obj=str(overrides))
+        pd.testing.assert_frame_equal(apply_filters(clean, filters, index=index), apply_filters(clean, filters))
+
+def test_rollup_index_matches_apply_filters(clean):
+    rollup = build_rollup(clean)
+    index = FilterIndex(rollup, date_column="Day_Ordered")
+    for overrides in filter_states(clean):
+        filters = {**FULL, **overrides}
+        expected = apply_filters(rollup, filters, date_column="Day_Ordered")
+        pd.testing.assert_frame_equal(rollup.take(index.select(filters)), expected, obj=str(overrides))
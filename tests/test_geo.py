@@ -0,0 +1,24 @@
+import numpy as np
+from haversine import haversine
+from libs import haversine_np
+
+def random_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-90, 90, n), rng.uniform(-180, 180, n), rng.uniform(-90, 90, n), rng.uniform(-180, 180, n)
+
+def test_matches_haversine_package():
+    lat1, lon1, lat2, lon2 = random_points(2_000)
+    expected = np.array([haversine((a, b), (c, d)) for a, b, c, d in zip(lat1, lon1, lat2, lon2)])
+    np.testing.assert_allclose(haversine_np(lat1, lon1, lat2, lon2), expected, rtol=0, atol=1e-9)
+    # Slices of any size, including a last partial one, give the same distances.
+    for chunk_size in (1, 7, 1_999, 2_000):
+        np.testing.assert_array_equal(haversine_np(lat1, lon1, lat2, lon2, chunk_size=chunk_size), haversine_np(lat1, lon1, lat2, lon2))
+
+def test_short_distances_and_scalars():
+    # City-scale distances, like the deliveries of the dataset.
+    lat1, lon1 = 22.72, 75.86
+    rng = np.random.default_rng(1)
+    lat2, lon2 = lat1 + rng.uniform(-0.2, 0.2, 500), lon1 + rng.uniform(-0.2, 0.2, 500)
+    expected = np.array([haversine((lat1, lon1), (c, d)) for c, d in zip(lat2, lon2)])
+    np.testing.assert_allclose(haversine_np(lat1, lon1, lat2, lon2), expected, rtol=0, atol=1e-9)
+    assert abs(float(haversine_np(lat1, lon1, lat1, lon1 + 1)) - haversine((lat1, lon1), (lat1, lon1 + 1))) <= 1e-9
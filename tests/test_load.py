@@ -0,0 +1,31 @@
+import os
+import pandas as pd
+import pytest
+import libs.utils
+from benchmarks.generate import write_raw_csv
+from libs import load_dataset
+
+def test_raw_csv_is_hashed_only_when_its_signature_changes(tmp_path, monkeypatch):
+    raw_path, cache_path, store_path = str(tmp_path / "raw.csv"), str(tmp_path / "clean.parquet"), str(tmp_path / "clean.columns")
+    write_raw_csv(raw_path, 1_000, seed=6)
+    df = load_dataset(raw_path, cache_path, store_path=store_path)
+    hashed = []
+    cache_key = libs.utils.cache_key
+    monkeypatch.setattr(libs.utils, "cache_key", lambda *args: hashed.append(args) or cache_key(*args))
+
+    pd.testing.assert_frame_equal(load_dataset(raw_path, cache_path, store_path=store_path), df)
+    assert hashed == []
+
+    # Touched without changing the contents: hashed once, then the new signature is recorded.
+    stat = os.stat(raw_path)
+    os.utime(raw_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    pd.testing.assert_frame_equal(load_dataset(raw_path, cache_path, store_path=store_path), df)
+    pd.testing.assert_frame_equal(load_dataset(raw_path, cache_path, store_path=store_path), df)
+    assert len(hashed) == 1
+
+def test_changed_raw_csv_rebuilds_the_cache(tmp_path):
+    raw_path, cache_path = str(tmp_path / "raw.csv"), str(tmp_path / "clean.parquet")
+    write_raw_csv(raw_path, 1_000, seed=6)
+    assert len(load_dataset(raw_path, cache_path)) == pytest.approx(1_000, abs=10)
+    write_raw_csv(raw_path, 500, seed=7)
+    assert len(load_dataset(raw_path, cache_path)) == pytest.approx(500, abs=10)
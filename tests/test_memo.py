@@ -0,0 +1,29 @@
+import os
+import pandas as pd
+from benchmarks.generate import write_raw_csv, generate_raw
+from libs import load_dashboard_data, append_orders, metrics_cache, RAW_DTYPES
+
+def test_dashboard_data_follows_dataset_changes(tmp_path):
+    raw_path, cache_path = str(tmp_path / "raw.csv"), str(tmp_path / "clean.parquet")
+    store_path = str(tmp_path / "clean.columns")
+    write_raw_csv(raw_path, 2_000, seed=1)
+    dataset = load_dashboard_data(raw_path, cache_path, store_path=store_path)
+    assert load_dashboard_data(raw_path, cache_path, store_path=store_path) is dataset
+    metrics_cache.call(len, f"{dataset.version}:filters", dataset.df)
+
+    # Appended orders are loaded by the next rerun, and the results of the old version are dropped.
+    new_path = str(tmp_path / "new.csv")
+    generate_raw(100, seed=2, start_id=2_000).to_csv(new_path, index=False)
+    append_orders(pd.read_csv(new_path, dtype=RAW_DTYPES), cache_path)
+    appended = load_dashboard_data(raw_path, cache_path, store_path=store_path)
+    assert appended is not dataset and appended.version != dataset.version
+    assert len(appended.df) > len(dataset.df)
+    assert metrics_cache.evict(dataset.version) == 0
+
+    # A new raw CSV rebuilds the dataset once.
+    write_raw_csv(raw_path, 1_000, seed=3)
+    # Coarse file system clocks could give the rewrite the modification time of the part appended above.
+    os.utime(raw_path, ns=(os.stat(raw_path).st_atime_ns, os.stat(raw_path).st_mtime_ns + 1_000_000_000))
+    rebuilt = load_dashboard_data(raw_path, cache_path, store_path=store_path)
+    assert rebuilt is not appended and len(rebuilt.df) < len(appended.df)
+    assert load_dashboard_data(raw_path, cache_path, store_path=store_path) is rebuilt
@@ -0,0 +1,22 @@
+import pytest
+from libs import PanelScheduler
+
+def fail():
+    raise ValueError("panel failed")
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_failed_panel_does_not_stop_the_others(workers):
+    rendered = []
+    with pytest.raises(ValueError, match="panel failed"):
+        with PanelScheduler(workers) as panels:
+            panels.submit(rendered.append, lambda: 1)
+            panels.submit(rendered.append, fail)
+            panels.submit(rendered.append, lambda: 3)
+    assert sorted(rendered) == [1, 3]
+
+def test_sequential_panels_render_in_submission_order():
+    rendered = []
+    with PanelScheduler(1) as panels:
+        for i in range(3):
+            panels.submit(rendered.append, int, i)
+    assert rendered == [0, 1, 2]
@@ -0,0 +1,56 @@
+import datetime as dt
+import pandas as pd
+import pytest
+from benchmarks.generate import write_raw_csv
+from libs import (
+    clear_data, apply_filters, build_rollup, append_rollup, get_metrics_company, plot_weekly_orders_per_service,
+    SharedDataset, ROLLUP_KEYS, RAW_DTYPES,
+    )
+
+FULL = {
+    "date": (dt.date(2022, 2, 11), dt.date(2022, 4, 6)),
+    "Delivery_person_Age": (0, 100),
+    "Delivery_person_Ratings": (0.0, 6.0),
+    "Road_traffic_density": [],
+    "City": [],
+    "Type_of_order": [],
+    "Festival": [],
+}
+
+@pytest.fixture(scope="module")
+def clean(tmp_path_factory):
+    path = tmp_path_factory.mktemp("rollup") / "raw.csv"
+    write_raw_csv(path, 3_000, seed=4)
+    return clear_data(pd.read_csv(path, dtype=RAW_DTYPES))
+
+def frame_company_metrics(df):
+    # Restaurant and service counts computed from the order frame.
+    restaurants = df.groupby(["Restaurant_latitude", "Restaurant_longitude"]).size()
+    services = df.groupby("Delivery_service_ID", observed=True).size()
+    return {"restaurants": len(restaurants), "mean_orders_per_restaurant": restaurants.mean(),
+            "delivery_services": len(services), "mean_deliveries_per_service": services.mean(), "total_deliveries": len(df)}
+
+@pytest.mark.parametrize("overrides, from_cube", [
+    ({}, True),
+    ({"City": ["Urban"], "date": (dt.date(2022, 3, 1), dt.date(2022, 3, 20))}, True),
+    ({"Delivery_person_Age": (25, 35)}, False),
+    ({"Delivery_person_Ratings": (4.5, 6.0), "Festival": ["No"]}, False),
+])
+def test_cube_answers_full_range_filters(clean, overrides, from_cube):
+    dataset = SharedDataset(clean)
+    filters = {**FULL, **overrides}
+    selection = dataset.select(filters)
+    assert (selection[1] is not False) == from_cube
+    df, rollup = dataset.frames(selection)
+    expected = apply_filters(clean, filters)
+    pd.testing.assert_frame_equal(df, expected)
+    metrics = get_metrics_company(df, rollup)
+    for name, value in frame_company_metrics(expected).items():
+        assert metrics[name] == pytest.approx(value, rel=1e-12)
+    assert metrics == get_metrics_company(expected)
+    assert plot_weekly_orders_per_service(rollup).to_json() == plot_weekly_orders_per_service(expected).to_json()
+
+def test_append_rollup_matches_build(clean):
+    appended = append_rollup(build_rollup(clean.iloc[:2_000]), clean.iloc[2_000:])
+    rebuilt = build_rollup(clean)
+    pd.testing.assert_frame_equal(appended.sort_values(ROLLUP_KEYS, ignore_index=True), rebuilt.sort_values(ROLLUP_KEYS, ignore_index=True), check_categorical=False)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from libs import SpatialIndex, haversine_np
+
+# Tolerance of the distance comparisons, and margin around the radius within which a point may fall on either side.
+TOLERANCE_KM = 1e-9
+
+def orders(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "ID": [f"0x{i:04x}" for i in range(n)],
+        "Restaurant_latitude": rng.choice(rng.uniform(10, 30, 40), n),
+        "Restaurant_longitude": rng.choice(rng.uniform(70, 90, 40), n),
+        "Delivery_location_latitude": rng.uniform(18, 19, n),
+        "Delivery_location_longitude": rng.uniform(72.5, 73.5, n),
+    })
+    # Points outside the maps (Null Island), never indexed.
+    df.iloc[::50, 3:] = 0.0
+    return df
+
+def distances_to(index, lat, lon):
+    # Distances from the query point to every indexed point, in the order of `points`.
+    return haversine_np(lat, lon, index.points.iloc[:, 0].to_numpy(), index.points.iloc[:, 1].to_numpy())
+
+def check_within(index, lat, lon, radius_km):
+    distances = distances_to(index, lat, lon)
+    positions, found = index.within(lat, lon, radius_km)
+    assert np.all(np.diff(found) >= 0)
+    np.testing.assert_allclose(found, distances[positions], rtol=0, atol=TOLERANCE_KM)
+    borderline = np.abs(distances - radius_km) <= TOLERANCE_KM
+    expected = set(np.flatnonzero((distances <= radius_km) & ~borderline))
+    assert expected <= set(positions)
+    assert set(positions) <= expected | set(np.flatnonzero(borderline))
+
+def test_within_matches_brute_force():
+    df = orders(5_000)
+    index = SpatialIndex(df, cell_km=5.0)
+    assert len(index.points) == 4_900
+    rng = np.random.default_rng(1)
+    cell_deg = 5.0 / (6371.0088 * np.pi / 180)
+    queries = list(zip(rng.uniform(17.8, 19.2, 20), rng.uniform(72.3, 73.7, 20)))
+    # Queries on cell edges, and far outside the grid.
+    queries += [(np.floor(18.5 / cell_deg) * cell_deg, np.floor(73.0 / cell_deg) * cell_deg), (40.0, 60.0), (18.5, 100.0)]
+    for lat, lon in queries:
+        # Radii within one cell, across a few rows and columns, and across the whole grid.
+        for radius_km in (0.0, 1.0, 4.9, 5.0, 12.5, 37.0, 150.0, 2_000.0):
+            check_within(index, lat, lon, radius_km)
+
+def test_nearest_matches_brute_force():
+    df = orders(3_000, seed=2)
+    rng = np.random.default_rng(3)
+    for index in (SpatialIndex(df, cell_km=2.0), SpatialIndex(df, "Restaurant_location", unique=True)):
+        for lat, lon in zip(rng.uniform(5, 35, 10), rng.uniform(65, 95, 10)):
+            distances = np.sort(distances_to(index, lat, lon))
+            for k in (1, 7, len(index.points), len(index.points) + 10):
+                positions, found = index.nearest(lat, lon, k)
+                assert len(positions) == min(k, len(index.points))
+                np.testing.assert_allclose(found, distances[:len(positions)], rtol=0, atol=TOLERANCE_KM)
+
+def test_empty_index():
+    df = orders(100)
+    df.iloc[:, 1:] = 0.0
+    for index in (SpatialIndex(df), SpatialIndex(df, "Restaurant_location", unique=True)):
+        assert len(index.points) == 0
+        assert len(index.within(18.5, 73.0, 1_000.0)[0]) == 0
+        positions, distances = index.nearest(18.5, 73.0, 5)
+        assert len(positions) == 0 and len(distances) == 0
@@ -0,0 +1,50 @@
+import pandas as pd
+from libs.utils import _assemble_timestamps
+
+def old_assemble_timestamps(order_date: pd.Series, time_ordered: pd.Series, time_picked: pd.Series):
+    # String concatenation and row-wise rollover of clear_data before the timestamps were vectorized.
+    df = pd.DataFrame({"Order_Date": order_date, "Time_Ordered": time_ordered, "Time_Order_picked": time_picked})
+    df["Order_Date"] = pd.to_datetime(df["Order_Date"], format="%d-%m-%Y").astype("string")
+    df["Time_Ordered"] = pd.to_datetime(df["Time_Ordered"], format="%H:%M:%S").dt.time.astype("string")
+    df["Time_Order_picked"] = pd.to_datetime(df["Time_Order_picked"], format="%H:%M:%S").dt.time.astype("string")
+    df["Time_Ordered"] = pd.to_datetime(df["Order_Date"] + " " + df["Time_Ordered"], format="%Y-%m-%d %H:%M:%S")
+    df["Time_Order_picked"] = pd.to_datetime(df["Order_Date"] + " " + df["Time_Order_picked"], format="%Y-%m-%d %H:%M:%S")
+    df["Time_Order_picked"] = df.apply(lambda row: row["Time_Order_picked"] + pd.Timedelta(days=1) if row["Time_Ordered"] > row["Time_Order_picked"] else row["Time_Order_picked"], axis=1)
+    return df["Time_Ordered"], df["Time_Order_picked"]
+
+def assemble(dates, ordered, picked):
+    order_date = pd.Series(dates, dtype=object)
+    return _assemble_timestamps(pd.to_datetime(order_date, format="%d-%m-%Y"), pd.Series(ordered, dtype=object), pd.Series(picked, dtype=object))
+
+def test_matches_old_pipeline():
+    dates = ["19-03-2022", "25-03-2022", "19-03-2022", "01-04-2022", "13-02-2022", "31-03-2022"]
+    ordered = ["11:30:00", "19:45:00", "08:30:00", "18:00:00", "23:55:00", "NaN"]
+    picked = ["11:45:00", "19:50:00", "08:45:00", "18:10:00", "00:05:00", "15:10:00"]
+    expected = old_assemble_timestamps(pd.Series(dates), pd.Series(ordered), pd.Series(picked))
+    result = assemble(dates, ordered, picked)
+    pd.testing.assert_series_equal(result[0], expected[0], check_names=False)
+    pd.testing.assert_series_equal(result[1], expected[1], check_names=False)
+
+def test_midnight_rollover():
+    time_ordered, time_picked = assemble(["31-03-2022", "31-03-2022"], ["23:50:00", "12:00:00"], ["00:10:00", "12:00:00"])
+    assert time_ordered[0] == pd.Timestamp("2022-03-31 23:50:00")
+    assert time_picked[0] == pd.Timestamp("2022-04-01 00:10:00")
+    assert time_picked[1] == pd.Timestamp("2022-03-31 12:00:00")
+
+def test_missing_and_invalid_times_are_nat():
+    dates = ["12-02-2022"] * 6
+    ordered = ["NaN", None, "", "abc", "24:00:00", "23:00:00"]
+    picked = ["00:10:00", "00:10:00", "00:10:00", "00:10:00", "00:10:00", "-01:00:00"]
+    time_ordered, time_picked = assemble(dates, ordered, picked)
+    assert time_ordered[:5].isna().all()
+    # A missing order time never moves the pick-up to the next day.
+    assert (time_picked[:5] == pd.Timestamp("2022-02-12 00:10:00")).all()
+    assert time_ordered[5] == pd.Timestamp("2022-02-12 23:00:00")
+    assert pd.isna(time_picked[5])
+
+def test_missing_date_is_nat():
+    order_date = pd.Series([pd.NaT, pd.Timestamp("2022-02-12")])
+    time_ordered, time_picked = _assemble_timestamps(order_date, pd.Series(["10:00:00", "10:00:00"]), pd.Series(["09:00:00", "09:00:00"]))
+    assert time_ordered.isna().tolist() == [True, False]
+    assert time_picked.isna().tolist() == [True, False]
+    assert time_picked[1] == pd.Timestamp("2022-02-13 09:00:00")